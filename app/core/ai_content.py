@@ -0,0 +1,185 @@
+"""
+AI Content Generator Module
+Generates the dialogue script and YouTube metadata in one structured
+(tool-use) Claude call, validated against a JSON schema
+"""
+import json
+
+from .prompts import get_prompt_registry
+from .llm_cache import ResponseCache
+from .clients import ClientRegistry
+from .llm_gateway import LLMGateway
+from .ai_script import SCRIPT_MODEL, SCRIPT_MAX_TOKENS
+
+CONTENT_TOOL = 'publish_video'
+# One retry with the validation error fed back before giving up
+CONTENT_MAX_ATTEMPTS = 2
+
+CONTENT_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'script': {
+            'type': 'array',
+            'description': '対談台本のセリフ（話者と本文）',
+            'minItems': 1,
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'speaker': {'type': 'string', 'minLength': 1},
+                    'text': {'type': 'string', 'minLength': 1}
+                },
+                'required': ['speaker', 'text']
+            }
+        },
+        'title': {'type': 'string', 'minLength': 1, 'maxLength': 100},
+        'description': {'type': 'string', 'minLength': 1, 'maxLength': 5000},
+        'tags': {
+            'type': 'array',
+            'minItems': 1,
+            'items': {'type': 'string'}
+        }
+    },
+    'required': ['script', 'title', 'description', 'tags']
+}
+
+_JSON_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str
+}
+
+
+class ContentValidationError(ValueError):
+    """Structured response does not match CONTENT_SCHEMA"""
+
+
+def validate(value, schema: dict, path: str = '$'):
+    """
+    Check a value against the subset of JSON Schema used by CONTENT_SCHEMA
+    Raises: ContentValidationError naming the first offending path
+    """
+    expected = schema.get('type')
+    if expected and not isinstance(value, _JSON_TYPES[expected]):
+        raise ContentValidationError(f"{path}: expected {expected}, got {type(value).__name__}")
+
+    if expected == 'object':
+        for name in schema.get('required', []):
+            if name not in value:
+                raise ContentValidationError(f"{path}: missing '{name}'")
+        for name, subschema in schema.get('properties', {}).items():
+            if name in value:
+                validate(value[name], subschema, f"{path}.{name}")
+    elif expected == 'array':
+        if len(value) < schema.get('minItems', 0):
+            raise ContentValidationError(f"{path}: needs at least {schema['minItems']} items")
+        for i, item in enumerate(value):
+            validate(item, schema.get('items', {}), f"{path}[{i}]")
+    elif expected == 'string':
+        text = value.strip()
+        if len(text) < schema.get('minLength', 0):
+            raise ContentValidationError(f"{path}: empty")
+        if 'maxLength' in schema and len(text) > schema['maxLength']:
+            raise ContentValidationError(f"{path}: longer than {schema['maxLength']} characters")
+
+
+class ContentGenerator:
+    """
+    Script and metadata generator using one Claude tool call
+    Replaces ScriptGenerator + MetadataGenerator (two serial requests and a
+    free-text metadata parse) when COMBINED_GENERATION is enabled
+    """
+
+    def __init__(self, cache: ResponseCache = None, clients: ClientRegistry = None, gateway: LLMGateway = None):
+        self.gateway = gateway or LLMGateway(clients=clients)
+        self.cache = cache
+
+    def generate_content(self, news_summary: str) -> dict:
+        """
+        Generate script and metadata from news summary
+        Args:
+            news_summary: News summary markdown
+        Returns: dict with script (text), parsed_script ({speaker, text} list)
+            and metadata (title, description, tags)
+        """
+        prompt_template = get_prompt_registry().get('content')
+        prompt = prompt_template.render(news_summary)
+
+        def create() -> str:
+            return json.dumps(self._request(prompt_template.text, prompt), ensure_ascii=False)
+
+        if self.cache is None:
+            raw_content = create()
+        else:
+            raw_content = self.cache.get_or_create(
+                'content', SCRIPT_MODEL, prompt_template.version, {'news_summary': news_summary}, SCRIPT_MAX_TOKENS, create,
+                cacheable=self.gateway.last_call_complete
+            )
+
+        content = json.loads(raw_content)
+        validate(content, CONTENT_SCHEMA)
+        return self._to_result(content)
+
+    def _request(self, prompt_template: str, prompt: str) -> dict:
+        """Call Claude with the tool forced; retry once with the validation error"""
+        messages: str | list[dict] = prompt
+        for attempt in range(1, CONTENT_MAX_ATTEMPTS + 1):
+            message = self.gateway.create(
+                'content',
+                SCRIPT_MODEL,
+                SCRIPT_MAX_TOKENS,
+                prompt_template,
+                messages,
+                tools=[{
+                    'name': CONTENT_TOOL,
+                    'description': '生成した台本とYouTubeメタデータを登録する',
+                    'input_schema': CONTENT_SCHEMA
+                }],
+                tool_choice={'type': 'tool', 'name': CONTENT_TOOL}
+            )
+            tool_use = next((block for block in message.content if block.type == 'tool_use'), None)
+            if tool_use is None:
+                # Nothing to attach a tool_result to: ask again from scratch
+                error = f"no {CONTENT_TOOL} call in response (stop_reason={message.stop_reason})"
+                if attempt == CONTENT_MAX_ATTEMPTS:
+                    raise ContentValidationError(error)
+                print(f"⚠️  Invalid structured content ({error}), retrying...")
+                messages = prompt
+                continue
+
+            try:
+                if message.stop_reason == 'max_tokens':
+                    raise ContentValidationError("response truncated at max_tokens")
+                validate(tool_use.input, CONTENT_SCHEMA)
+                return tool_use.input
+            except ContentValidationError as e:
+                if attempt == CONTENT_MAX_ATTEMPTS:
+                    raise
+                print(f"⚠️  Invalid structured content ({e}), retrying...")
+                messages = [
+                    {"role": "user", "content": prompt},
+                    {"role": "assistant", "content": message.content},
+                    {"role": "user", "content": [{
+                        'type': 'tool_result',
+                        'tool_use_id': tool_use.id,
+                        'is_error': True,
+                        'content': f"Schema validation failed: {e}. Call {CONTENT_TOOL} again with the full corrected input."
+                    }]}
+                ]
+
+    @staticmethod
+    def _to_result(content: dict) -> dict:
+        """Shape the tool input like the two-call path's stage outputs"""
+        parsed_script = [
+            {'speaker': line['speaker'].strip(), 'text': line['text'].strip()}
+            for line in content['script']
+        ]
+        tags = [tag.strip() for tag in content['tags']]
+        return {
+            'script': '\n'.join(f"{line['speaker']}: {line['text']}" for line in parsed_script),
+            'parsed_script': parsed_script,
+            'metadata': {
+                'title': content['title'].strip(),
+                'description': content['description'].strip(),
+                'tags': list(dict.fromkeys(tag for tag in tags if tag))
+            }
+        }
@@ -2,15 +2,17 @@
 AI Metadata Generator Module
 Generates YouTube title, description, and tags
 """
-import anthropic
-from config import config
-from .prompts import get_prompt
+from .prompts import get_prompt_registry
+from .llm_cache import ResponseCache
+from .clients import ClientRegistry
+from .llm_gateway import LLMGateway
 
 class MetadataGenerator:
     """YouTube metadata generator using Claude AI"""
 
-    def __init__(self):
-        self.client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
+    def __init__(self, cache: ResponseCache = None, clients: ClientRegistry = None, gateway: LLMGateway = None):
+        self.gateway = gateway or LLMGateway(clients=clients)
+        self.cache = cache
 
     def generate_metadata(self, script: str) -> dict:
         """
@@ -19,18 +21,23 @@ class MetadataGenerator:
             script: Video script
         Returns: dict with title, description, tags
         """
-        prompt_template = get_prompt('metadata')
-        prompt = f"{prompt_template}\n\n## 台本:\n{script[:2000]}..."  # Limit length
+        prompt_template = get_prompt_registry().get('metadata')
+        script_excerpt = script[:2000]  # Limit length
+        prompt = prompt_template.render(f"{script_excerpt}...")
+        model = "claude-3-5-sonnet-20241022"
+        max_tokens = 1000
 
-        message = self.client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=1000,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        def create() -> str:
+            message = self.gateway.create('metadata', model, max_tokens, prompt_template.text, prompt)
+            return message.content[0].text
 
-        raw_metadata = message.content[0].text
+        if self.cache is None:
+            raw_metadata = create()
+        else:
+            raw_metadata = self.cache.get_or_create(
+                'metadata', model, prompt_template.version, {'script': script_excerpt}, max_tokens, create,
+                cacheable=self.gateway.last_call_complete
+            )
 
         return self._parse_metadata(raw_metadata)
 
@@ -2,32 +2,41 @@
 AI News Module
 Uses Claude API to search and summarize economic news
 """
-import anthropic
-from config import config
-from .prompts import get_prompt
+from datetime import date
+from .prompts import get_prompt_registry
+from .llm_cache import ResponseCache
+from .clients import ClientRegistry
+from .llm_gateway import LLMGateway
 
 class NewsSearcher:
     """Economic news searcher using Claude AI"""
 
-    def __init__(self):
-        self.client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
+    def __init__(self, cache: ResponseCache = None, clients: ClientRegistry = None, gateway: LLMGateway = None):
+        self.gateway = gateway or LLMGateway(clients=clients)
+        self.cache = cache
 
     def search_news(self) -> str:
         """
         Search for today's important economic news
         Returns: News summary as markdown string
         """
-        prompt = get_prompt('news_search')
-
-        message = self.client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=2000,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        prompt = get_prompt_registry().get('news_search')
+        model = "claude-3-5-sonnet-20241022"
+        max_tokens = 2000
+        today = date.today().isoformat()
+
+        def create() -> str:
+            message = self.gateway.create('news_search', model, max_tokens, prompt.text, prompt.render(today))
+            return message.content[0].text
 
-        return message.content[0].text
+        if self.cache is None:
+            return create()
+
+        # Today's date keeps news entries from being reused across days
+        return self.cache.get_or_create(
+            'news_search', model, prompt.version, {'date': today}, max_tokens, create,
+            cacheable=self.gateway.last_call_complete
+        )
 
     def get_news_summary(self) -> dict:
         """
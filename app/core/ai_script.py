@@ -2,15 +2,66 @@
 AI Script Generator Module
 Generates dialogue scripts from news summaries
 """
-import anthropic
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
 from config import config
-from .prompts import get_prompt
+from .prompts import Prompt, get_prompt_registry
+from .llm_cache import ResponseCache
+from .clients import ClientRegistry
+from .llm_gateway import LLMGateway
+from .script_outline import OutlineSection, build_outline, stitch_sections
+
+SCRIPT_MODEL = "claude-3-5-sonnet-20241022"
+SCRIPT_MAX_TOKENS = 8000
+# Per-section limit; a news section is a fraction of the episode
+SECTION_MAX_TOKENS = 4000
+
+
+class ScriptStream:
+    """
+    Iterator over dialogue lines parsed while Claude is still writing
+    The full script text is available in `text` once iteration finishes
+    """
+
+    def __init__(self, chunks: Iterator[str], parse_line):
+        self._chunks = chunks
+        self._parse_line = parse_line
+        self._parts = []
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        return ''.join(self._parts)
+
+    def __iter__(self) -> Iterator[dict]:
+        buffer = ''
+        for chunk in self._chunks:
+            self._parts.append(chunk)
+            buffer += chunk
+            # Only complete lines are parsed; the tail waits for more text
+            *complete, buffer = buffer.split('\n')
+            for line in complete:
+                parsed = self._parse_line(line)
+                if parsed:
+                    yield parsed
+
+        parsed = self._parse_line(buffer)
+        if parsed:
+            yield parsed
+        self.done = True
+
 
 class ScriptGenerator:
     """Dialogue script generator using Claude AI"""
 
-    def __init__(self):
-        self.client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
+    def __init__(self, cache: ResponseCache = None, clients: ClientRegistry = None, gateway: LLMGateway = None):
+        self.gateway = gateway or LLMGateway(clients=clients)
+        self.cache = cache
+
+    def _build_prompt(self, news_summary: str) -> tuple[Prompt, str]:
+        """Return (template, per-call prompt) for a news summary"""
+        prompt_template = get_prompt_registry().get('script')
+        return prompt_template, prompt_template.render(news_summary)
 
     def generate_script(self, news_summary: str) -> str:
         """
@@ -19,18 +70,113 @@ class ScriptGenerator:
             news_summary: News summary markdown
         Returns: Dialogue script
         """
-        prompt_template = get_prompt('script')
-        prompt = f"{prompt_template}\n\n## ニュース要約:\n{news_summary}"
+        prompt_template, prompt = self._build_prompt(news_summary)
+
+        def create() -> str:
+            message = self.gateway.create('script', SCRIPT_MODEL, SCRIPT_MAX_TOKENS, prompt_template.text, prompt)
+            return message.content[0].text
 
-        message = self.client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=8000,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
+        if self.cache is None:
+            return create()
+
+        return self.cache.get_or_create(
+            'script', SCRIPT_MODEL, prompt_template.version, {'news_summary': news_summary}, SCRIPT_MAX_TOKENS, create,
+            cacheable=self.gateway.last_call_complete
         )
 
-        return message.content[0].text
+    def generate_script_sectioned(self, news_summary: str, workers: int = None) -> str:
+        """
+        Generate dialogue script section by section, all sections concurrently
+        The outline (intro, one section per news item, wrap-up) comes from the
+        news summary headings; every section shares the script prompt so
+        speakers and tone match, and the seams are repaired when stitching.
+        Falls back to generate_script when the summary has no news headings.
+        Args:
+            news_summary: News summary markdown
+            workers: Concurrent section requests (default SCRIPT_SECTION_WORKERS)
+        Returns: Dialogue script
+        """
+        outline = build_outline(news_summary)
+        if not outline:
+            return self.generate_script(news_summary)
+
+        workers = workers or config.SCRIPT_SECTION_WORKERS
+        with ThreadPoolExecutor(max_workers=min(workers, len(outline)), thread_name_prefix='script') as executor:
+            texts = list(executor.map(
+                lambda section: self._generate_section(news_summary, outline, section),
+                outline
+            ))
+
+        lines, repairs = stitch_sections(outline, [self.parse_script(text) for text in texts])
+        if repairs:
+            print(f"🧵 Stitched {len(outline)} sections ({len(repairs)} boundary repairs)")
+        return '\n'.join(f"{line['speaker']}: {line['text']}" for line in lines)
+
+    def _generate_section(self, news_summary: str, outline: list[OutlineSection], section: OutlineSection) -> str:
+        """Write one outline section"""
+        registry = get_prompt_registry()
+        script_prompt, section_prompt = registry.get('script'), registry.get('script_section')
+        position = outline.index(section)
+        neighbours = [
+            f"前のパート: {outline[position - 1].title}" if position > 0 else "これは番組の冒頭です",
+            f"次のパート: {outline[position + 1].title}" if position + 1 < len(outline) else "これは番組の最後です"
+        ]
+        # Template and news summary are shared by every section, so both are cached
+        static = [f"{script_prompt.text}\n\n{section_prompt.text}", script_prompt.render(news_summary)]
+        prompt = (
+            f"## 担当パート ({position + 1}/{len(outline)}): {section.title}\n"
+            f"{section.brief}\n\n"
+            f"- 長さ: 約{section.target_chars}文字\n"
+            + '\n'.join(f"- {line}" for line in neighbours)
+        )
+
+        def create() -> str:
+            message = self.gateway.create('script', SCRIPT_MODEL, SECTION_MAX_TOKENS, static, prompt)
+            return message.content[0].text
+
+        if self.cache is None:
+            return create()
+
+        inputs = {
+            'news_summary': news_summary,
+            'outline': [s.title for s in outline],
+            'section': section.key,
+            'target_chars': section.target_chars
+        }
+        return self.cache.get_or_create(
+            'script', SCRIPT_MODEL, f"{script_prompt.version}+{section_prompt.version}", inputs,
+            SECTION_MAX_TOKENS, create,
+            cacheable=self.gateway.last_call_complete
+        )
+
+    def stream_script(self, news_summary: str) -> ScriptStream:
+        """
+        Generate dialogue script as a stream of parsed lines
+        Each {speaker, text} line is yielded as soon as it is complete,
+        so TTS can start before the whole script has been written
+        Args:
+            news_summary: News summary markdown
+        Returns: ScriptStream yielding {speaker, text} dicts
+        """
+        prompt_template, prompt = self._build_prompt(news_summary)
+        inputs = {'news_summary': news_summary}
+
+        if self.cache is not None:
+            key = self.cache.make_key(SCRIPT_MODEL, prompt_template.version, inputs, SCRIPT_MAX_TOKENS)
+            cached = self.cache.get('script', key)
+            if cached is not None:
+                return ScriptStream(iter([cached]), self._parse_line)
+
+        def chunks() -> Iterator[str]:
+            parts = []
+            for text in self.gateway.stream('script', SCRIPT_MODEL, SCRIPT_MAX_TOKENS, prompt_template.text, prompt):
+                parts.append(text)
+                yield text
+
+            if self.cache is not None and self.gateway.last_call_complete():
+                self.cache.set('script', key, ''.join(parts))
+
+        return ScriptStream(chunks(), self._parse_line)
 
     def parse_script(self, script: str) -> list[dict]:
         """
@@ -41,15 +187,23 @@ class ScriptGenerator:
         parsed = []
 
         for line in lines:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-
-            if ':' in line:
-                speaker, text = line.split(':', 1)
-                parsed.append({
-                    'speaker': speaker.strip(),
-                    'text': text.strip()
-                })
+            parsed_line = self._parse_line(line)
+            if parsed_line:
+                parsed.append(parsed_line)
 
         return parsed
+
+    def _parse_line(self, line: str) -> dict | None:
+        """Parse a single 'speaker: text' line, or None if it is not dialogue"""
+        line = line.strip()
+        if not line or line.startswith('#'):
+            return None
+
+        if ':' in line:
+            speaker, text = line.split(':', 1)
+            return {
+                'speaker': speaker.strip(),
+                'text': text.strip()
+            }
+
+        return None
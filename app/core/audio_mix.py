@@ -0,0 +1,322 @@
+"""
+Audio Mixing Module
+Block-streaming NumPy mixer that loops BGM, ducks it under speech and
+normalises the master to a target integrated loudness
+"""
+import os
+import tempfile
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from .ffmpeg_utils import run_ffmpeg, has_audio_stream
+
+try:
+    from scipy.signal import lfilter
+except ImportError:  # K-weighting is skipped without SciPy
+    lfilter = None
+
+ENVELOPE_HOP = 0.01  # seconds per ducking envelope window
+LOUDNESS_STEP = 0.1  # seconds per loudness sub-block (400 ms blocks, 75% overlap)
+
+
+def _k_weighting(sample_rate: int) -> list[tuple[np.ndarray, np.ndarray]]:
+    """ITU-R BS.1770 K-weighting biquads (high shelf, then high pass)"""
+    # Pre-filter (high shelf)
+    f0, gain_db, q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    k = np.tan(np.pi * f0 / sample_rate)
+    vh = 10 ** (gain_db / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = (
+        np.array([(vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0]),
+        np.array([1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0])
+    )
+
+    # RLB filter (high pass)
+    f0, q = 38.13547087602444, 0.5003270373238773
+    k = np.tan(np.pi * f0 / sample_rate)
+    a0 = 1 + k / q + k * k
+    high_pass = (
+        np.array([1.0, -2.0, 1.0]),
+        np.array([1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0])
+    )
+    return [shelf, high_pass]
+
+
+class LoudnessMeter:
+    """Streaming gated integrated-loudness meter (BS.1770 style)"""
+
+    def __init__(self, sample_rate: int, channels: int):
+        self.step = int(sample_rate * LOUDNESS_STEP)
+        self.filters = _k_weighting(sample_rate) if lfilter else []
+        self.states = [np.zeros((2, channels)) for _ in self.filters]
+        self.sub_blocks = []
+        self._pending = np.zeros((0, channels), dtype=np.float32)
+
+    def add(self, block: np.ndarray):
+        """Feed float samples shaped (frames, channels)"""
+        weighted = block
+        for i, (b, a) in enumerate(self.filters):
+            weighted, self.states[i] = lfilter(b, a, weighted, axis=0, zi=self.states[i])
+
+        weighted = np.concatenate([self._pending, weighted])
+        usable = len(weighted) - len(weighted) % self.step
+        if usable:
+            squares = weighted[:usable].reshape(-1, self.step, weighted.shape[1]) ** 2
+            # Channel weights are 1.0 for mono/stereo
+            self.sub_blocks.append(squares.mean(axis=1).sum(axis=1))
+        self._pending = weighted[usable:]
+
+    def integrated(self) -> float:
+        """Integrated loudness in LUFS (-inf for silence)"""
+        if not self.sub_blocks:
+            return float('-inf')
+        sub = np.concatenate(self.sub_blocks)
+        if len(sub) < 4:
+            blocks = np.array([sub.mean()])
+        else:
+            # 400 ms blocks with 75% overlap = mean of 4 consecutive sub-blocks
+            cumulative = np.concatenate([[0.0], np.cumsum(sub)])
+            blocks = (cumulative[4:] - cumulative[:-4]) / 4
+
+        with np.errstate(divide='ignore'):
+            loudness = -0.691 + 10 * np.log10(blocks)
+        gated = blocks[loudness > -70]
+        if not len(gated):
+            return float('-inf')
+
+        relative_gate = -0.691 + 10 * np.log10(gated.mean()) - 10
+        with np.errstate(divide='ignore'):
+            gated = gated[-0.691 + 10 * np.log10(gated) > relative_gate]
+        return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+class AudioMixer:
+    """Mixes speech and looped BGM in fixed-size blocks with bounded memory"""
+
+    def __init__(
+        self,
+        sample_rate: int = 48000,
+        channels: int = 2,
+        block_seconds: float = 1.0,
+        bgm_volume: float = 0.1,
+        duck_gain: float = 0.35,
+        duck_threshold_db: float = -45.0,
+        attack: float = 0.08,
+        release: float = 0.5,
+        target_lufs: float | None = -14.0
+    ):
+        """
+        Args:
+            sample_rate: Output sample rate
+            channels: Output channel count
+            block_seconds: Samples processed per block
+            bgm_volume: BGM level relative to speech (0.0 to 1.0)
+            duck_gain: Extra BGM gain while speech is active
+            duck_threshold_db: Speech RMS (dBFS) above which BGM ducks
+            attack: Seconds the duck fades in ahead of speech
+            release: Seconds the duck is held after speech stops
+            target_lufs: Integrated loudness of the master (None = no normalisation)
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.hop = int(sample_rate * ENVELOPE_HOP)
+        # Whole envelope windows and loudness sub-blocks per block
+        step = int(sample_rate * LOUDNESS_STEP)
+        self.block = max(step, int(sample_rate * block_seconds) // step * step)
+        self.bgm_volume = bgm_volume
+        self.duck_gain = duck_gain
+        self.duck_threshold_db = duck_threshold_db
+        self.attack = attack
+        self.release = release
+        self.target_lufs = target_lufs
+
+    def mix(self, speech_file: str | None, bgm_file: str, output_file: str) -> str:
+        """
+        Mix looped BGM under speech into a 16-bit PCM WAV
+        Args:
+            speech_file: Dialogue audio (any format FFmpeg reads), or None for BGM only
+            bgm_file: Background music path
+            output_file: Output WAV path
+        Returns: Path to mixed audio
+        """
+        with tempfile.TemporaryDirectory(dir=Path(output_file).parent) as tmp:
+            bgm = self._decode(bgm_file, Path(tmp) / "bgm.raw")
+            if len(bgm) == 0:
+                raise ValueError(f"BGM file has no audio: {bgm_file}")
+
+            if speech_file:
+                speech = self._decode(speech_file, Path(tmp) / "speech.raw")
+                envelope = self._duck_envelope(speech)
+            else:
+                speech = None
+                envelope = None
+
+            frames = len(speech) if speech is not None else len(bgm)
+
+            gain = 1.0
+            if self.target_lufs is not None:
+                meter = LoudnessMeter(self.sample_rate, self.channels)
+                peak = 0.0
+                for block in self._mixed_blocks(speech, bgm, envelope, frames):
+                    meter.add(block)
+                    peak = max(peak, float(np.abs(block).max()))
+                gain = self._normalisation_gain(meter.integrated(), peak)
+
+            with wave.open(str(output_file), 'wb') as out:
+                out.setnchannels(self.channels)
+                out.setsampwidth(2)
+                out.setframerate(self.sample_rate)
+                for block in self._mixed_blocks(speech, bgm, envelope, frames):
+                    block *= gain
+                    np.clip(block, -32768, 32767, out=block)
+                    out.writeframes(block.astype('<i2').tobytes())
+
+        return output_file
+
+    def _decode(self, source: str, raw_path: Path) -> np.ndarray:
+        """Decode any input to interleaved s16le at the mix format and memory-map it"""
+        run_ffmpeg([
+            '-i', source,
+            '-vn',
+            '-f', 's16le',
+            '-acodec', 'pcm_s16le',
+            '-ac', self.channels,
+            '-ar', self.sample_rate,
+            raw_path
+        ])
+        if os.path.getsize(raw_path) == 0:
+            return np.zeros((0, self.channels), dtype='<i2')
+        return np.memmap(raw_path, dtype='<i2', mode='r').reshape(-1, self.channels)
+
+    def _duck_envelope(self, speech: np.ndarray) -> np.ndarray:
+        """
+        BGM gain per envelope window
+        Windows within `attack` before or `release` after speech get duck_gain,
+        with a moving-average ramp so gain changes never click
+        """
+        levels = []
+        for start in range(0, len(speech), self.block):
+            block = speech[start:start + self.block].astype(np.float32).mean(axis=1)
+            usable = len(block) - len(block) % self.hop
+            if usable:
+                windows = block[:usable].reshape(-1, self.hop)
+                levels.append(np.sqrt((windows ** 2).mean(axis=1)) / 32768.0)
+            if len(block) > usable:
+                tail = block[usable:]
+                levels.append(np.array([np.sqrt((tail ** 2).mean()) / 32768.0]))
+        if not levels:
+            return np.ones(1, dtype=np.float32)
+
+        with np.errstate(divide='ignore'):
+            active = 20 * np.log10(np.concatenate(levels)) > self.duck_threshold_db
+
+        attack_windows = max(1, int(self.attack / ENVELOPE_HOP))
+        release_windows = max(1, int(self.release / ENVELOPE_HOP))
+
+        # Speech anywhere in [i - release, i + attack] ducks window i
+        counts = np.concatenate([[0], np.cumsum(active)])
+        n = len(active)
+        idx = np.arange(n)
+        upper = np.minimum(idx + attack_windows + 1, n)
+        lower = np.maximum(idx - release_windows, 0)
+        held = (counts[upper] - counts[lower]) > 0
+
+        target = np.where(held, self.duck_gain, 1.0)
+        padded = np.concatenate([np.full(attack_windows, target[0]), target])
+        ramp = np.concatenate([[0.0], np.cumsum(padded)])
+        return ((ramp[attack_windows:] - ramp[:-attack_windows])[1:] / attack_windows).astype(np.float32)
+
+    def _mixed_blocks(self, speech, bgm: np.ndarray, envelope, frames: int):
+        """Yield float32 mixed blocks shaped (frames, channels)"""
+        bgm_length = len(bgm)
+        for start in range(0, frames, self.block):
+            end = min(start + self.block, frames)
+
+            # Loop BGM by wrapping indices instead of materialising the loop
+            bgm_block = bgm[np.arange(start, end) % bgm_length].astype(np.float32)
+            bgm_block *= self.bgm_volume
+
+            if envelope is not None:
+                positions = (np.arange(start, end) + 0.5) / self.hop - 0.5
+                gains = np.interp(positions, np.arange(len(envelope)), envelope)
+                bgm_block *= gains[:, None].astype(np.float32)
+
+            if speech is not None:
+                bgm_block += speech[start:end].astype(np.float32)
+            yield bgm_block
+
+    def _normalisation_gain(self, loudness: float, peak: float) -> float:
+        """Linear gain to reach target_lufs without clipping the peak"""
+        if not np.isfinite(loudness) or peak == 0:
+            return 1.0
+        # Samples are int16-scaled; loudness was measured on the same scale
+        full_scale_offset = 20 * np.log10(32768.0)
+        measured = loudness - full_scale_offset
+        gain = 10 ** ((self.target_lufs - measured) / 20)
+        return float(min(gain, 32767.0 / peak))
+
+
+def mix_bgm_audio(
+    speech_file: str,
+    bgm_file: str,
+    output_file: str,
+    bgm_volume: float = 0.1,
+    mixer: AudioMixer = None
+) -> str:
+    """
+    Mix looped BGM under a speech track into a PCM WAV
+    Used before the first video encode so the video is encoded only once
+    Args:
+        speech_file: Dialogue audio path
+        bgm_file: Background music path
+        output_file: Output WAV path
+        bgm_volume: BGM volume (0.0 to 1.0)
+        mixer: Mixer settings (defaults to 48 kHz stereo, -14 LUFS)
+    Returns: Path to mixed audio
+    """
+    mixer = mixer or AudioMixer(bgm_volume=bgm_volume)
+    return mixer.mix(speech_file, bgm_file, output_file)
+
+
+def remux_with_bgm(
+    video_file: str,
+    bgm_file: str,
+    output_file: str,
+    bgm_volume: float = 0.1,
+    mixer: AudioMixer = None
+) -> str:
+    """
+    Replace a video's audio with speech + BGM, copying the video stream untouched
+    Args:
+        video_file: Input video path
+        bgm_file: Background music path
+        output_file: Output video path
+        bgm_volume: BGM volume (0.0 to 1.0)
+        mixer: Mixer settings (defaults to 48 kHz stereo, -14 LUFS)
+    Returns: Path to output video
+    """
+    mixer = mixer or AudioMixer(bgm_volume=bgm_volume)
+    speech_source = video_file if has_audio_stream(video_file) else None
+
+    mixed_audio = Path(output_file).with_suffix('.mix.wav')
+    try:
+        mixer.mix(speech_source, bgm_file, str(mixed_audio))
+        run_ffmpeg([
+            '-i', video_file,
+            '-i', mixed_audio,
+            '-map', '0:v:0',
+            '-map', '1:a:0',
+            '-c:v', 'copy',
+            '-c:a', 'aac',
+            '-b:a', '192k',
+            '-shortest',
+            '-movflags', '+faststart',
+            output_file
+        ])
+    finally:
+        mixed_audio.unlink(missing_ok=True)
+
+    return output_file
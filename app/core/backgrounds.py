@@ -0,0 +1,75 @@
+"""
+Background Provider Module
+Decodes and scales video backgrounds once and serves them from memory
+"""
+import threading
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+
+class BackgroundProvider:
+    """Produces RGB background frames at output resolution, cached per source"""
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._frames: dict[tuple, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def frame(
+        self,
+        width: int,
+        height: int,
+        image_path: str = None,
+        color: tuple = (30, 30, 50)
+    ) -> np.ndarray:
+        """
+        Get a background frame
+        Args:
+            width: Output width
+            height: Output height
+            image_path: Background image; falls back to color if missing
+            color: Solid background colour
+        Returns: Read-only (height, width, 3) uint8 array
+        """
+        if image_path and Path(image_path).exists():
+            path = Path(image_path).resolve()
+            # mtime in the key picks up an image replaced in place
+            key = ('image', str(path), path.stat().st_mtime_ns, width, height)
+        else:
+            path = None
+            key = ('color', tuple(color[:3]), width, height)
+
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                # Re-insert so dict order tracks recency
+                self._frames[key] = self._frames.pop(key)
+                return frame
+
+        if path is not None:
+            frame = self._load_image(path, width, height)
+        else:
+            frame = np.full((height, width, 3), color[:3], dtype=np.uint8)
+        # Shared between videos and segments, so nobody may draw on it
+        frame.flags.writeable = False
+
+        with self._lock:
+            self._frames[key] = frame
+            while len(self._frames) > self.max_entries:
+                del self._frames[next(iter(self._frames))]
+        return frame
+
+    def _load_image(self, path: Path, width: int, height: int) -> np.ndarray:
+        """Decode an image and scale it to the output size"""
+        with Image.open(path) as img:
+            img = img.convert('RGB')
+            if img.size != (width, height):
+                img = img.resize((width, height), Image.LANCZOS)
+            return np.array(img)
+
+    def clear(self):
+        """Drop all cached frames"""
+        with self._lock:
+            self._frames.clear()
@@ -0,0 +1,162 @@
+"""
+Client Registry Module
+Process-wide API clients that own long-lived, pooled HTTP connections
+for Anthropic, LINE, Gemini and plain HTTP providers
+"""
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from config import config
+
+
+def keepalive_socket_options(idle_seconds: float) -> list[tuple]:
+    """urllib3 socket options enabling TCP keep-alive probes after idle_seconds"""
+    options = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    if hasattr(socket, 'TCP_KEEPIDLE'):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, max(1, int(idle_seconds))))
+    return options
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """
+    Pooled adapter that honours HTTP_KEEPALIVE_SECONDS: pooled sockets get
+    TCP keep-alive, and the pool is dropped after sitting idle longer than
+    the keep-alive window (servers close such connections anyway)
+    """
+
+    def __init__(self, keepalive: float, **kwargs):
+        self.keepalive = keepalive
+        self._last_used = time.monotonic()
+        self._idle_lock = threading.Lock()
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = keepalive_socket_options(self.keepalive)
+        super().init_poolmanager(*args, **kwargs)
+
+    def send(self, request, *args, **kwargs):
+        with self._idle_lock:
+            now = time.monotonic()
+            if self.keepalive and now - self._last_used > self.keepalive:
+                self.poolmanager.clear()
+            self._last_used = now
+        return super().send(request, *args, **kwargs)
+
+
+class ClientRegistry:
+    """
+    Lazily built provider clients shared by every pipeline in the process
+    Each provider gets one connection pool sized by HTTP_POOL_SIZE, so
+    concurrent runs reuse warm keep-alive connections instead of paying a
+    TLS handshake per client
+    """
+
+    def __init__(self, pool_size: int = None, keepalive: float = None, timeout: float = None):
+        """
+        Args:
+            pool_size: Maximum pooled connections per provider
+            keepalive: Seconds an idle connection is kept open (httpx expiry for
+                Anthropic, pool drop for the requests session) and the TCP
+                keep-alive probe delay for every provider
+            timeout: Default request timeout in seconds
+        """
+        self.pool_size = pool_size or config.HTTP_POOL_SIZE
+        self.keepalive = keepalive if keepalive is not None else config.HTTP_KEEPALIVE_SECONDS
+        self.timeout = timeout or config.HTTP_TIMEOUT_SECONDS
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str, factory):
+        with self._lock:
+            if name not in self._clients:
+                self._clients[name] = factory()
+            return self._clients[name]
+
+    @property
+    def anthropic(self):
+        """Shared anthropic.Anthropic client"""
+        return self._get('anthropic', self._build_anthropic)
+
+    def _build_anthropic(self):
+        import anthropic
+        import httpx
+
+        return anthropic.Anthropic(
+            api_key=config.ANTHROPIC_API_KEY,
+            base_url=config.ANTHROPIC_BASE_URL or None,
+            timeout=self.timeout,
+            http_client=anthropic.DefaultHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                    keepalive_expiry=self.keepalive
+                )
+            )
+        )
+
+    @property
+    def line_messaging(self):
+        """Shared LINE MessagingApi"""
+        return self._get('line_messaging', self._build_line_messaging)
+
+    def _build_line_messaging(self):
+        from linebot.v3.messaging import ApiClient, Configuration, MessagingApi
+
+        configuration = Configuration(
+            host=config.LINE_API_URL,
+            access_token=config.LINE_CHANNEL_ACCESS_TOKEN
+        )
+        # urllib3 pool behind the generated client; connections stay alive between pushes
+        configuration.connection_pool_maxsize = self.pool_size
+        configuration.socket_options = keepalive_socket_options(self.keepalive)
+        return MessagingApi(ApiClient(configuration))
+
+    def configure_gemini(self):
+        """Configure the Gemini SDK once per process (it keeps module-level state)"""
+        def configure():
+            import google.generativeai as genai
+
+            genai.configure(api_key=config.GEMINI_API_KEY)
+            return genai
+
+        return self._get('gemini', configure)
+
+    @property
+    def http(self) -> requests.Session:
+        """Shared requests session for REST providers without an SDK"""
+        return self._get('http', self._build_http)
+
+    def _build_http(self) -> requests.Session:
+        session = requests.Session()
+        adapter = KeepAliveAdapter(self.keepalive, pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            if name == 'line_messaging':
+                client.api_client.close()
+            elif name != 'gemini':
+                client.close()
+
+
+_client_registry = None
+_client_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Get the process-wide client registry"""
+    global _client_registry
+    with _client_registry_lock:
+        if _client_registry is None:
+            _client_registry = ClientRegistry()
+        return _client_registry
@@ -0,0 +1,63 @@
+"""
+FFmpeg Utilities
+Locates the FFmpeg binary and runs encoder commands directly
+"""
+import shutil
+import subprocess
+
+# moov up front for progressive playback; needs a second pass over the file
+FASTSTART_MOVFLAGS = '+faststart'
+# Self-contained fragments appended in order, so the file can be read while written
+FRAGMENTED_MOVFLAGS = '+frag_keyframe+empty_moov+default_base_moof'
+
+
+def get_ffmpeg_binary() -> str:
+    """
+    Get path to the FFmpeg binary
+    Prefers the binary bundled with imageio-ffmpeg (installed with MoviePy)
+    and falls back to whatever `ffmpeg` is on PATH
+    """
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        pass
+
+    binary = shutil.which('ffmpeg')
+    if binary is None:
+        raise FileNotFoundError("FFmpeg binary not found")
+    return binary
+
+
+def run_ffmpeg(args: list[str], quiet: bool = True) -> None:
+    """
+    Run FFmpeg with the given arguments
+    Args:
+        args: Arguments after the binary name
+        quiet: Suppress FFmpeg banner and progress output
+    """
+    command = [get_ffmpeg_binary(), '-y']
+    if quiet:
+        command += ['-hide_banner', '-loglevel', 'error']
+    command += [str(arg) for arg in args]
+
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg failed ({result.returncode}): {result.stderr.strip()}")
+
+
+def color_to_hex(color: tuple) -> str:
+    """Convert an RGB tuple to FFmpeg's 0xRRGGBB colour syntax"""
+    r, g, b = color[:3]
+    return f"0x{r:02x}{g:02x}{b:02x}"
+
+
+def has_audio_stream(media_file: str) -> bool:
+    """Check whether a media file contains an audio stream"""
+    result = subprocess.run(
+        [get_ffmpeg_binary(), '-hide_banner', '-i', str(media_file)],
+        capture_output=True,
+        text=True
+    )
+    # `ffmpeg -i` without an output always exits non-zero; the stream list is on stderr
+    return 'Audio:' in result.stderr
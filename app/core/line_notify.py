@@ -3,20 +3,16 @@ LINE Notification Module
 Sends messages to LINE users
 """
 from linebot.v3.messaging import (
-    ApiClient,
-    MessagingApi,
     PushMessageRequest,
     TextMessage
 )
-from config import config
+from .clients import ClientRegistry, get_client_registry
 
 class LineNotifier:
     """LINE notification sender"""
 
-    def __init__(self):
-        self.api_client = ApiClient()
-        self.api_client.configuration.access_token = config.LINE_CHANNEL_ACCESS_TOKEN
-        self.messaging_api = MessagingApi(self.api_client)
+    def __init__(self, clients: ClientRegistry = None):
+        self.messaging_api = (clients or get_client_registry()).line_messaging
 
     def send_message(self, user_id: str, message: str):
         """
@@ -0,0 +1,177 @@
+"""
+LLM Response Cache
+Content-addressed on-disk cache for Claude responses with LRU eviction
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from config import config
+
+# Seconds each stage's entries stay valid (None = never expires)
+DEFAULT_STAGE_TTLS = {
+    'news_search': 24 * 60 * 60,
+    'script': None,
+    'metadata': None,
+    'content': None,
+}
+
+
+class ResponseCache:
+    """Disk cache keyed by a hash of model, prompt template, inputs and max_tokens"""
+
+    def __init__(
+        self,
+        cache_dir: str = None,
+        max_bytes: int = None,
+        max_age: float = None,
+        stage_ttls: dict = None
+    ):
+        self.cache_dir = Path(cache_dir or config.LLM_CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else config.LLM_CACHE_MAX_MB * 1024 * 1024
+        self.max_age = max_age if max_age is not None else config.LLM_CACHE_MAX_AGE_DAYS * 24 * 60 * 60
+        self.stage_ttls = {**DEFAULT_STAGE_TTLS, **(stage_ttls or {})}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(model: str, template: str, inputs: dict, max_tokens: int) -> str:
+        """Hash the parts of a request that determine its response"""
+        payload = json.dumps(
+            {
+                'model': model,
+                'template': template,
+                'inputs': inputs,
+                'max_tokens': max_tokens
+            },
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, stage: str, key: str) -> str | None:
+        """Get a cached response, or None on miss or expiry"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._count(hit=False)
+            return None
+
+        ttl = self.stage_ttls.get(stage)
+        if ttl is not None and time.time() - entry['created_at'] > ttl:
+            path.unlink(missing_ok=True)
+            self._count(hit=False)
+            return None
+
+        # Bump mtime so eviction treats this entry as recently used
+        os.utime(path)
+        self._count(hit=True)
+        return entry['response']
+
+    def set(self, stage: str, key: str, response: str):
+        """Store a response atomically and evict if over budget"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {'stage': stage, 'created_at': time.time(), 'response': response}
+
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        self.evict()
+
+    def get_or_create(
+        self,
+        stage: str,
+        model: str,
+        template: str,
+        inputs: dict,
+        max_tokens: int,
+        create: Callable[[], str],
+        cacheable: Callable[[], bool] = None
+    ) -> str:
+        """
+        Return the cached response for a request, calling create() on a miss
+        Args:
+            stage: Prompt name, used for the TTL lookup
+            model: Claude model ID
+            template: Prompt template version (see Prompt.version)
+            inputs: Values substituted into the template
+            max_tokens: Output token limit
+            create: Callable that performs the API request
+            cacheable: Called after create(); False keeps the response out of the cache
+        Returns: Response text
+        """
+        key = self.make_key(model, template, inputs, max_tokens)
+        cached = self.get(stage, key)
+        if cached is not None:
+            print(f"💾 Cache hit: {stage}")
+            return cached
+
+        response = create()
+        if cacheable is None or cacheable():
+            self.set(stage, key, response)
+        return response
+
+    def evict(self):
+        """Remove entries older than max_age, then least recently used until under max_bytes"""
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache"""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
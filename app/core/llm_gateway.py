@@ -0,0 +1,386 @@
+"""
+LLM Gateway Module
+Single entry point for Claude requests: provider-side prompt caching of the
+static prompt prefix, per-call token and latency accounting, and per-run /
+per-day token budgets that degrade requests instead of failing them
+"""
+import fcntl
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import date
+from pathlib import Path
+from typing import Iterator
+
+from config import config
+from .clients import ClientRegistry, get_client_registry
+
+# Smallest output a request is still worth sending with
+MIN_OUTPUT_TOKENS = 256
+
+# Shortest prefix Claude will cache; a cache_control marker on anything shorter
+# is ignored, so e.g. the bare news/script/metadata templates never hit
+MIN_CACHEABLE_TOKENS = 1024
+MIN_CACHEABLE_TOKENS_HAIKU = 2048
+
+# Budgets count input-token equivalents: cache reads are billed at a tenth of
+# an input token, cache writes at a quarter more
+CACHE_READ_WEIGHT = 0.1
+CACHE_WRITE_WEIGHT = 1.25
+
+
+class BudgetExceededError(RuntimeError):
+    """Not even a truncated request fits in the remaining token budget"""
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Conservative token estimate without a network round trip
+    Japanese text is close to one token per character, ASCII about four
+    characters per token
+    """
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return len(text) - ascii_chars + ascii_chars // 4 + 1
+
+
+def min_cacheable_tokens(model: str) -> int:
+    """Minimum cacheable prefix length for a Claude model"""
+    return MIN_CACHEABLE_TOKENS_HAIKU if 'haiku' in model else MIN_CACHEABLE_TOKENS
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text from the end until its estimate fits in max_tokens"""
+    estimate = estimate_tokens(text)
+    if estimate <= max_tokens:
+        return text
+    keep = int(len(text) * max_tokens / estimate)
+    while keep > 0 and estimate_tokens(text[:keep]) > max_tokens:
+        keep = int(keep * 0.9)
+    return text[:keep]
+
+
+@dataclass
+class LLMCall:
+    """Accounting record of one Claude request"""
+
+    stage: str
+    model: str
+    input_tokens: int
+    output_tokens: int
+    cache_read_tokens: int
+    cache_creation_tokens: int
+    latency: float
+    downgraded: bool = False
+    truncated: bool = False
+
+    @property
+    def total_tokens(self) -> int:
+        """Raw tokens processed, cached or not"""
+        return self.input_tokens + self.output_tokens + self.cache_read_tokens + self.cache_creation_tokens
+
+    @property
+    def budget_tokens(self) -> int:
+        """Tokens charged against the run and daily budgets, cache traffic weighted by its price"""
+        return math.ceil(
+            self.input_tokens + self.output_tokens
+            + self.cache_read_tokens * CACHE_READ_WEIGHT
+            + self.cache_creation_tokens * CACHE_WRITE_WEIGHT
+        )
+
+
+class DailyUsageLedger:
+    """
+    Tokens spent today by every run, persisted so restarts keep counting
+    Updates to the file are serialised across processes with a lock file
+    next to it
+    """
+
+    def __init__(self, path: str = None):
+        self.path = Path(path or config.LLM_USAGE_FILE)
+        self._lock = threading.RLock()
+        self._reserved = 0
+
+    def locked(self) -> threading.RLock:
+        """Hold the ledger so a spent() check and the reserve() after it act as one step"""
+        return self._lock
+
+    def _read(self) -> int:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+        return entry['tokens'] if entry.get('date') == date.today().isoformat() else 0
+
+    def spent(self) -> int:
+        """Tokens used plus tokens reserved by requests in flight"""
+        with self._lock:
+            return self._read() + self._reserved
+
+    def reserve(self, tokens: int):
+        with self._lock:
+            self._reserved += tokens
+
+    def settle(self, reserved: int, used: int):
+        """Replace a reservation with the tokens the request actually used"""
+        with self._lock:
+            self._reserved -= reserved
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path.with_suffix('.lock'), 'a') as lock_file:
+                # Another process may settle between our read and replace otherwise
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                entry = {'date': date.today().isoformat(), 'tokens': self._read() + used}
+                tmp_path = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f)
+                os.replace(tmp_path, self.path)
+
+
+_daily_ledger = None
+_daily_ledger_lock = threading.Lock()
+
+
+def get_daily_ledger() -> DailyUsageLedger:
+    """Get the process-wide daily usage ledger"""
+    global _daily_ledger
+    with _daily_ledger_lock:
+        if _daily_ledger is None:
+            _daily_ledger = DailyUsageLedger()
+        return _daily_ledger
+
+
+class LLMGateway:
+    """
+    Claude requests for one pipeline run
+    Each request is split into a static prefix (prompt templates, shared
+    context) sent as system blocks and a dynamic user suffix; the prefix is
+    cache-marked when it is long enough for Claude to cache.
+    Before a request would overrun the run or daily budget it is switched to
+    the fallback model, then its dynamic input is truncated and its output
+    limit lowered; only a request that cannot fit at all is refused
+    """
+
+    def __init__(
+        self,
+        clients: ClientRegistry = None,
+        run_budget: int = None,
+        daily_budget: int = None,
+        fallback_model: str = None,
+        downgrade_at: float = None,
+        ledger: DailyUsageLedger = None,
+        prompt_caching: bool = None
+    ):
+        """
+        Args:
+            clients: Provider clients (defaults to the process-wide registry)
+            run_budget: Tokens this run may use (0 = unlimited)
+            daily_budget: Tokens all runs may use today (0 = unlimited)
+            fallback_model: Cheaper model used once a budget runs low
+            downgrade_at: Budget fraction after which the fallback model is used
+            ledger: Shared record of today's usage
+            prompt_caching: Mark static prefixes for provider-side caching
+        """
+        self.client = (clients or get_client_registry()).anthropic
+        self.run_budget = run_budget if run_budget is not None else config.LLM_RUN_TOKEN_BUDGET
+        self.daily_budget = daily_budget if daily_budget is not None else config.LLM_DAILY_TOKEN_BUDGET
+        self.fallback_model = fallback_model if fallback_model is not None else config.LLM_FALLBACK_MODEL
+        self.downgrade_at = downgrade_at if downgrade_at is not None else config.LLM_DOWNGRADE_AT
+        self.ledger = ledger or get_daily_ledger()
+        self.prompt_caching = config.LLM_PROMPT_CACHING if prompt_caching is None else prompt_caching
+        self.calls: list[LLMCall] = []
+        self._run_used = 0
+        self._run_reserved = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def create(
+        self,
+        stage: str,
+        model: str,
+        max_tokens: int,
+        static: str | list[str],
+        dynamic: str | list[dict],
+        **kwargs
+    ):
+        """
+        Send a messages.create request through the budget and cache layer
+        Args:
+            stage: Prompt name, for accounting
+            model: Preferred Claude model
+            max_tokens: Preferred output limit
+            static: Prefix parts that are identical across calls (cached)
+            dynamic: Per-call user text, or a full messages list (never truncated)
+            **kwargs: Passed to messages.create (tools, tool_choice, ...)
+        Returns: The Anthropic Message
+        """
+        request, reservation, flags = self._prepare(stage, model, max_tokens, static, dynamic)
+        started = time.perf_counter()
+        try:
+            message = self.client.messages.create(**request, **kwargs)
+        except Exception:
+            self._release(reservation)
+            raise
+        self._record(stage, request['model'], message.usage, time.perf_counter() - started, reservation, flags)
+        return message
+
+    def stream(
+        self,
+        stage: str,
+        model: str,
+        max_tokens: int,
+        static: str | list[str],
+        dynamic: str
+    ) -> Iterator[str]:
+        """Streaming variant of create(); yields text deltas"""
+        request, reservation, flags = self._prepare(stage, model, max_tokens, static, dynamic)
+        started = time.perf_counter()
+        try:
+            with self.client.messages.stream(**request) as stream:
+                yield from stream.text_stream
+                usage = stream.get_final_message().usage
+        except BaseException:
+            self._release(reservation)
+            raise
+        self._record(stage, request['model'], usage, time.perf_counter() - started, reservation, flags)
+
+    def last_call_complete(self) -> bool:
+        """Whether this thread's last request ran unmodified (safe to cache its response)"""
+        return not getattr(self._local, 'degraded', False)
+
+    def _remaining(self) -> tuple[int | None, float]:
+        """
+        Tokens left under the tighter budget (None = unlimited) and the largest fraction used
+        Callers hold self._lock and the ledger lock
+        """
+        limits = []
+        if self.run_budget:
+            limits.append((self.run_budget, self._run_used + self._run_reserved))
+        if self.daily_budget:
+            limits.append((self.daily_budget, self.ledger.spent()))
+        if not limits:
+            return None, 0.0
+        return (
+            min(budget - used for budget, used in limits),
+            max(used / budget for budget, used in limits)
+        )
+
+    def _prepare(self, stage, model, max_tokens, static, dynamic) -> tuple[dict, int, dict]:
+        """
+        Build the request, fitted to the remaining budget, and reserve its tokens
+        The check, the fitting and the reservation happen under the run and
+        ledger locks, so concurrent requests cannot all fit into the same room
+        """
+        parts = [static] if isinstance(static, str) else list(static)
+        static_tokens = sum(estimate_tokens(part) for part in parts)
+        dynamic_tokens = estimate_tokens(dynamic) if isinstance(dynamic, str) else sum(
+            estimate_tokens(json.dumps(m['content'], ensure_ascii=False, default=str)) for m in dynamic
+        )
+        flags = {'downgraded': False, 'truncated': False}
+
+        # Lock order: run, then ledger (the ledger is shared by every run's gateway)
+        with self._lock, self.ledger.locked():
+            remaining, used_fraction = self._remaining()
+            model, max_tokens, dynamic, dynamic_tokens = self._fit(
+                stage, model, max_tokens, static_tokens, dynamic, dynamic_tokens, remaining, used_fraction, flags
+            )
+            reservation = static_tokens + dynamic_tokens + max_tokens
+            self._run_reserved += reservation
+            self.ledger.reserve(reservation)
+
+        if flags['downgraded'] or flags['truncated']:
+            print(
+                f"💰 {stage}: token budget low ({remaining} left), "
+                f"using {model} with max_tokens={max_tokens}"
+                + (" and truncated input" if flags['truncated'] else "")
+            )
+
+        system = [{'type': 'text', 'text': part} for part in parts]
+        if self.prompt_caching and system and static_tokens >= min_cacheable_tokens(model):
+            # Everything up to and including this block is cached provider-side
+            system[-1]['cache_control'] = {'type': 'ephemeral'}
+        messages = [{"role": "user", "content": dynamic}] if isinstance(dynamic, str) else dynamic
+
+        self._local.degraded = flags['downgraded'] or flags['truncated']
+        request = {'model': model, 'max_tokens': max_tokens, 'system': system, 'messages': messages}
+        return request, reservation, flags
+
+    def _fit(self, stage, model, max_tokens, static_tokens, dynamic, dynamic_tokens, remaining, used_fraction, flags):
+        """Downgrade the model, truncate the input and lower max_tokens until the request fits"""
+        if remaining is None:
+            return model, max_tokens, dynamic, dynamic_tokens
+
+        projected = static_tokens + dynamic_tokens + max_tokens
+        if self.fallback_model and model != self.fallback_model and (
+            used_fraction >= self.downgrade_at or projected > remaining
+        ):
+            model = self.fallback_model
+            flags['downgraded'] = True
+
+        if projected > remaining:
+            # Shorter input before a cut-off answer: keep room for half the requested output
+            output_floor = min(max(MIN_OUTPUT_TOKENS, max_tokens // 2), max_tokens)
+            input_room = remaining - static_tokens - output_floor
+            if isinstance(dynamic, str) and dynamic_tokens > input_room > 0:
+                dynamic = truncate_to_tokens(dynamic, input_room)
+                dynamic_tokens = estimate_tokens(dynamic)
+                flags['truncated'] = True
+            output_room = remaining - static_tokens - dynamic_tokens
+            if output_room < MIN_OUTPUT_TOKENS:
+                raise BudgetExceededError(
+                    f"{stage}: {remaining} tokens left in budget, request needs at least "
+                    f"{static_tokens + dynamic_tokens + MIN_OUTPUT_TOKENS}"
+                )
+            if output_room < max_tokens:
+                max_tokens = output_room
+                flags['truncated'] = True
+
+        return model, max_tokens, dynamic, dynamic_tokens
+
+    def _release(self, reservation: int):
+        with self._lock:
+            self._run_reserved -= reservation
+        self.ledger.settle(reservation, 0)
+
+    def _record(self, stage, model, usage, latency, reservation, flags):
+        call = LLMCall(
+            stage=stage,
+            model=model,
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            cache_read_tokens=getattr(usage, 'cache_read_input_tokens', None) or 0,
+            cache_creation_tokens=getattr(usage, 'cache_creation_input_tokens', None) or 0,
+            latency=round(latency, 3),
+            **flags
+        )
+        with self._lock:
+            self._run_reserved -= reservation
+            self._run_used += call.budget_tokens
+            self.calls.append(call)
+        self.ledger.settle(reservation, call.budget_tokens)
+
+    def stats(self) -> dict:
+        """Token and latency totals for this run, overall and per stage"""
+        with self._lock:
+            calls = list(self.calls)
+        stages = {}
+        for call in calls:
+            totals = stages.setdefault(call.stage, {
+                'calls': 0, 'input_tokens': 0, 'output_tokens': 0,
+                'cache_read_tokens': 0, 'cache_creation_tokens': 0, 'latency': 0.0
+            })
+            totals['calls'] += 1
+            for name in ('input_tokens', 'output_tokens', 'cache_read_tokens', 'cache_creation_tokens'):
+                totals[name] += getattr(call, name)
+            totals['latency'] = round(totals['latency'] + call.latency, 3)
+        return {
+            'total_tokens': sum(call.total_tokens for call in calls),
+            'budget_tokens': sum(call.budget_tokens for call in calls),
+            'run_budget': self.run_budget or None,
+            'downgraded_calls': sum(call.downgraded for call in calls),
+            'truncated_calls': sum(call.truncated for call in calls),
+            'stages': stages,
+            'calls': [asdict(call) for call in calls]
+        }
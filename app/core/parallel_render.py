@@ -0,0 +1,171 @@
+"""
+Parallel Render Module
+Splits a subtitle timeline into frame-aligned segments, encodes them in a
+process pool and joins them with a stream-copy concat
+"""
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .ffmpeg_utils import FASTSTART_MOVFLAGS, run_ffmpeg
+from .subtitle_renderer import SubtitleCompositor, SubtitleRenderer, SubtitleStyle
+
+
+def plan_segments(
+    duration: float,
+    fps: int,
+    segment_count: int,
+    boundaries: list[float] = None
+) -> list[tuple[int, int]]:
+    """
+    Choose segment cut points
+    Each ideal cut (duration / segment_count apart) moves to the nearest
+    dialogue boundary within half a segment, then snaps to the frame grid
+    Args:
+        duration: Timeline length in seconds
+        fps: Frame rate
+        segment_count: Desired number of segments
+        boundaries: Preferred cut times, e.g. caption start times
+    Returns: List of (start_frame, end_frame) pairs covering the timeline
+    """
+    total_frames = int(round(duration * fps))
+    segment_count = max(1, min(segment_count, total_frames // fps or 1))
+    boundaries = sorted(boundaries or [])
+    ideal_length = duration / segment_count
+
+    cuts = [0]
+    for i in range(1, segment_count):
+        ideal = i * ideal_length
+        nearby = [b for b in boundaries if abs(b - ideal) <= ideal_length / 2]
+        cut_time = min(nearby, key=lambda b: abs(b - ideal)) if nearby else ideal
+        cut = int(round(cut_time * fps))
+        if cuts[-1] < cut < total_frames:
+            cuts.append(cut)
+    cuts.append(total_frames)
+
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def _segment_subtitles(subtitles: list[dict], start: float, end: float) -> list[dict]:
+    """Captions visible in [start, end), shifted to segment-local time"""
+    return [
+        {
+            'text': sub['text'],
+            'start': max(sub['start'], start) - start,
+            'end': min(sub['end'], end) - start
+        }
+        for sub in subtitles
+        if sub['end'] > start and sub['start'] < end
+    ]
+
+
+def render_segment(job: dict) -> str:
+    """
+    Encode one video-only segment
+    Module-level so it can run in a worker process
+    """
+    from moviepy.editor import VideoClip
+
+    frames = job['end_frame'] - job['start_frame']
+    compositor = SubtitleCompositor(
+        job['background'],
+        job['subtitles'],
+        SubtitleRenderer(),
+        job['style']
+    )
+    # Half a frame short so MoviePy's arange yields exactly `frames` frames
+    clip = VideoClip(compositor.frame_at, duration=(frames - 0.5) / job['fps'])
+    clip.write_videofile(
+        job['output_file'],
+        fps=job['fps'],
+        codec='libx264',
+        audio=False,
+        preset=job['preset'],
+        threads=1,
+        ffmpeg_params=['-pix_fmt', 'yuv420p'],
+        logger=None
+    )
+    clip.close()
+    return job['output_file']
+
+
+def render_parallel(
+    background: np.ndarray,
+    subtitles: list[dict],
+    audio_file: str,
+    duration: float,
+    output_file: str,
+    fps: int,
+    style: SubtitleStyle,
+    workers: int,
+    preset: str = 'veryfast',
+    movflags: str = FASTSTART_MOVFLAGS
+) -> str:
+    """
+    Render a subtitle video across CPU cores
+    Args:
+        background: RGB background frame at output resolution
+        subtitles: List of {text, start, end} dicts
+        audio_file: Audio track muxed into the final file
+        duration: Timeline length in seconds
+        output_file: Output video path
+        fps: Frame rate
+        style: Caption style
+        workers: Number of encoder processes
+        preset: libx264 preset used for every segment
+        movflags: MP4 layout of the joined file
+    Returns: Path to generated video
+    """
+    # A few segments per worker keeps the pool busy when segments differ in cost
+    segments = plan_segments(
+        duration,
+        fps,
+        workers * 2,
+        boundaries=[sub['start'] for sub in subtitles]
+    )
+    print(f"🧩 Rendering {len(segments)} segments on {workers} workers...")
+
+    with tempfile.TemporaryDirectory(dir=Path(output_file).parent) as tmp:
+        tmp_dir = Path(tmp)
+        jobs = []
+        for i, (start_frame, end_frame) in enumerate(segments):
+            start, end = start_frame / fps, end_frame / fps
+            jobs.append({
+                'background': background,
+                'subtitles': _segment_subtitles(subtitles, start, end),
+                'start_frame': start_frame,
+                'end_frame': end_frame,
+                'fps': fps,
+                'style': style,
+                'preset': preset,
+                'output_file': str(tmp_dir / f"segment_{i:04d}.mp4")
+            })
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn')
+        ) as pool:
+            segment_files = list(pool.map(render_segment, jobs))
+
+        concat_list = tmp_dir / "segments.txt"
+        concat_list.write_text(
+            ''.join(f"file '{Path(f).resolve()}'\n" for f in segment_files)
+        )
+
+        # Stream-copy the video; only the audio track is encoded
+        run_ffmpeg([
+            '-f', 'concat', '-safe', '0', '-i', concat_list,
+            '-i', audio_file,
+            '-map', '0:v:0',
+            '-map', '1:a:0',
+            '-c:v', 'copy',
+            '-c:a', 'aac',
+            '-b:a', '192k',
+            '-movflags', movflags,
+            output_file
+        ])
+
+    return output_file
@@ -1,25 +1,168 @@
 """
 Prompt management module
-Loads prompts from prompts.yaml
+Loads prompts from prompts.yaml into a process-wide registry that reloads
+when the file changes
 """
-import yaml
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 
-def load_prompts(file_path: str = "prompts.yaml") -> dict:
-    """Load prompts from YAML file"""
-    path = Path(file_path)
-    if not path.exists():
-        raise FileNotFoundError(f"Prompts file not found: {file_path}")
+import yaml
+
+from config import config
+
+# prompts.yaml at the repository root, independent of the working directory
+DEFAULT_PROMPTS_FILE = Path(__file__).resolve().parents[2] / 'prompts.yaml'
+
+# Top-level key of prompts.yaml holding the per-prompt input headings
+INPUT_HEADINGS_KEY = 'input_headings'
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """One prompt template with its content version"""
+
+    name: str
+    text: str
+    version: str
+    input_prefix: str = field(default='', repr=False)
+
+    def render(self, value: str) -> str:
+        """Per-call input with its heading (the template itself is the static prefix)"""
+        return self.input_prefix + value
+
+
+def _is_string_map(value) -> bool:
+    return isinstance(value, dict) and all(
+        isinstance(name, str) and isinstance(text, str) for name, text in value.items()
+    )
+
+
+def _version(text: str, input_prefix: str) -> str:
+    digest = hashlib.sha256(text.encode('utf-8'))
+    if input_prefix:
+        # The heading is part of what Claude sees, so changing it invalidates cached responses
+        digest.update(b'\0' + input_prefix.encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def _parse(raw: bytes, source) -> dict[str, Prompt]:
+    prompts = yaml.safe_load(raw)
+    if not isinstance(prompts, dict):
+        raise ValueError(f"Prompts file must map names to strings: {source}")
+    prompts = dict(prompts)
+    headings = prompts.pop(INPUT_HEADINGS_KEY, {})
+    if not _is_string_map(prompts):
+        raise ValueError(f"Prompts file must map names to strings: {source}")
+    if not _is_string_map(headings):
+        raise ValueError(f"'{INPUT_HEADINGS_KEY}' must map prompt names to strings: {source}")
+
+    return {
+        name: Prompt(
+            name=name,
+            text=text,
+            version=_version(text, headings.get(name, '')),
+            input_prefix=headings.get(name, '')
+        )
+        for name, text in prompts.items()
+    }
+
+
+class PromptRegistry:
+    """
+    Parsed prompts shared by every generator
+    The file is stat'ed at most once per check_interval; it is re-read only
+    when its mtime or size changed, and a broken edit keeps the last good
+    prompts in place
+    """
+
+    def __init__(self, path: str = None, check_interval: float = 1.0):
+        self.path = Path(path or config.PROMPTS_FILE or DEFAULT_PROMPTS_FILE)
+        self.check_interval = check_interval
+        self._prompts: dict[str, Prompt] = {}
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self._refresh(force=True)
+
+    def _refresh(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+
+        with self._lock:
+            if not force and now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                if not self._prompts:
+                    raise FileNotFoundError(f"Prompts file not found: {self.path}")
+                return
+
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature == self._signature:
+                return
+            try:
+                prompts = _parse(self.path.read_bytes(), self.path)
+            except (yaml.YAMLError, ValueError) as e:
+                if not self._prompts:
+                    raise
+                print(f"⚠️  Keeping previous prompts, {self.path} is invalid: {e}")
+                return
+
+            self._prompts = prompts
+            self._signature = signature
+            self.reloads += 1
+
+    def get(self, name: str) -> Prompt:
+        """Get a prompt by name"""
+        self._refresh()
+        try:
+            return self._prompts[name]
+        except KeyError:
+            raise KeyError(f"Prompt '{name}' not found in {self.path.name}") from None
+
+    def versions(self) -> dict[str, str]:
+        """Content hash of every loaded prompt"""
+        self._refresh()
+        return {name: prompt.version for name, prompt in self._prompts.items()}
+
+    def all(self) -> dict[str, str]:
+        """Text of every loaded prompt"""
+        self._refresh()
+        return {name: prompt.text for name, prompt in self._prompts.items()}
+
+
+_prompt_registry = None
+_prompt_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Get the process-wide prompt registry"""
+    global _prompt_registry
+    with _prompt_registry_lock:
+        if _prompt_registry is None:
+            _prompt_registry = PromptRegistry()
+        return _prompt_registry
+
 
-    with open(path, 'r', encoding='utf-8') as f:
-        prompts = yaml.safe_load(f)
+def load_prompts(file_path: str = None) -> dict:
+    """Prompt texts by name, from the shared registry (or a one-off read of file_path)"""
+    if file_path is None:
+        return get_prompt_registry().all()
+    return PromptRegistry(file_path).all()
 
-    return prompts
 
 def get_prompt(name: str, prompts: dict = None) -> str:
-    """Get a specific prompt by name"""
+    """Get a specific prompt's text by name"""
     if prompts is None:
-        prompts = load_prompts()
+        return get_prompt_registry().get(name).text
 
     if name not in prompts:
         raise KeyError(f"Prompt '{name}' not found in prompts.yaml")
@@ -0,0 +1,414 @@
+"""
+Resumable Upload Module
+Google resumable-upload protocol client with a persisted session and
+throughput-adaptive chunk sizes
+"""
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+import requests
+
+from .clients import get_client_registry
+
+# The protocol requires every chunk except the last to be a multiple of 256 KiB
+CHUNK_GRANULARITY = 256 * 1024
+
+RETRYABLE_STATUS = {500, 502, 503, 504}
+
+
+class UploadSessionExpiredError(RuntimeError):
+    """Raised when the server no longer knows the session URI"""
+
+
+@dataclass
+class UploadSession:
+    """Persisted state of one resumable upload"""
+
+    session_uri: str
+    file: str
+    size: int
+    mtime_ns: int
+    offset: int = 0
+    created_at: float = 0.0
+
+
+class UploadSessionStore:
+    """Keeps one upload session in a JSON file, written atomically"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def load(self) -> UploadSession | None:
+        try:
+            return UploadSession(**json.loads(self.path.read_text(encoding='utf-8')))
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return None
+
+    def save(self, session: UploadSession):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(asdict(session)), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+
+class AdaptiveChunker:
+    """
+    Picks chunk sizes so each request takes about `target_seconds`
+    Throughput is a moving average over completed chunks; the target grows
+    on high-latency links so per-request overhead stays small
+    """
+
+    def __init__(
+        self,
+        initial: int = 8 * 1024 * 1024,
+        minimum: int = CHUNK_GRANULARITY,
+        maximum: int = 256 * 1024 * 1024,
+        target_seconds: float = 4.0,
+        smoothing: float = 0.3
+    ):
+        self.minimum = self._align(minimum)
+        self.maximum = self._align(maximum)
+        self.target_seconds = target_seconds
+        self.smoothing = smoothing
+        self.size = min(max(self._align(initial), self.minimum), self.maximum)
+        self.throughput = None  # bytes per second
+        self.latency = None  # seconds per empty round trip
+
+    @staticmethod
+    def _align(size: int) -> int:
+        return max(CHUNK_GRANULARITY, size // CHUNK_GRANULARITY * CHUNK_GRANULARITY)
+
+    def _average(self, current: float | None, sample: float) -> float:
+        if current is None:
+            return sample
+        return current + self.smoothing * (sample - current)
+
+    def record_latency(self, seconds: float):
+        """Round trip of a request without a body"""
+        self.latency = self._average(self.latency, seconds)
+
+    def record_chunk(self, size: int, seconds: float):
+        """A chunk of `size` bytes took `seconds` end to end"""
+        transfer = max(seconds - (self.latency or 0.0), 1e-3)
+        self.throughput = self._average(self.throughput, size / transfer)
+
+        # Keep latency under ~10% of each request
+        target = max(self.target_seconds, 10 * (self.latency or 0.0))
+        self.size = min(max(self._align(int(self.throughput * target)), self.minimum), self.maximum)
+
+    def record_failure(self):
+        """Back off to smaller chunks after a failed request"""
+        self.size = max(self.minimum, self._align(self.size // 2))
+
+
+class Mp4BoxScanner:
+    """Tracks where the complete top-level boxes of a growing MP4 file end"""
+
+    def __init__(self):
+        self.position = 0
+
+    def complete_until(self, file_path: str) -> int:
+        """Offset just past the last top-level box that is fully written"""
+        if not os.path.exists(file_path):
+            return 0
+        size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as f:
+            while self.position + 8 <= size:
+                f.seek(self.position)
+                header = f.read(16)
+                box_size = int.from_bytes(header[:4], 'big')
+                if box_size == 1:
+                    if len(header) < 16:
+                        break
+                    box_size = int.from_bytes(header[8:16], 'big')
+                elif box_size == 0:
+                    # Box runs to end of file: only complete once the writer closes
+                    break
+                if box_size < 8 or self.position + box_size > size:
+                    break
+                self.position += box_size
+        return self.position
+
+
+class ResumableUploader:
+    """Uploads a file with the resumable protocol, resuming a persisted session if present"""
+
+    def __init__(
+        self,
+        authorize: Callable[[], dict],
+        upload_url: str,
+        session_store: UploadSessionStore = None,
+        chunker: AdaptiveChunker = None,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        http: requests.Session = None,
+        on_progress: Callable[[int, int], None] = None
+    ):
+        """
+        Args:
+            authorize: Returns auth headers; called before every request so tokens can refresh
+            upload_url: Session-initiation endpoint
+            session_store: Where the session URI and committed offset persist (optional)
+            chunker: Chunk sizing policy
+            max_retries: Consecutive retries per chunk before giving up
+            backoff: Base delay in seconds for exponential backoff
+            http: Shared HTTP session
+            on_progress: Called with (committed bytes, total bytes) after each chunk
+        """
+        self.authorize = authorize
+        self.upload_url = upload_url
+        self.session_store = session_store
+        self.chunker = chunker or AdaptiveChunker()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.http = http or get_client_registry().http
+        self.on_progress = on_progress
+        self.requests_sent = 0
+
+    def upload(self, file_path: str, metadata: dict, content_type: str = 'video/*') -> dict:
+        """
+        Upload file_path, resuming a saved session for the same file
+        Args:
+            file_path: File to upload
+            metadata: JSON resource body sent when the session is created
+            content_type: MIME type of the media
+        Returns: JSON resource returned by the server
+        """
+        stat = os.stat(file_path)
+        session = self._saved_session(file_path, stat)
+        offset = None
+        if session:
+            try:
+                offset = self.query_offset(session.session_uri, stat.st_size)
+                print(f"♻️  Resuming upload at {offset}/{stat.st_size} bytes")
+            except UploadSessionExpiredError:
+                session = None
+
+        if session is None:
+            session = UploadSession(
+                session_uri=self.create_session(metadata, stat.st_size, content_type),
+                file=str(file_path),
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                created_at=time.time()
+            )
+            offset = 0
+            self._persist(session)
+
+        with open(file_path, 'rb') as f:
+            result = self._send(session, f, offset)
+
+        if self.session_store:
+            self.session_store.clear()
+        return result
+
+    def _saved_session(self, file_path: str, stat: os.stat_result) -> UploadSession | None:
+        if not self.session_store:
+            return None
+        session = self.session_store.load()
+        # A rewritten file must not continue an upload of the old bytes
+        if session and (
+            session.file == str(file_path)
+            and session.size == stat.st_size
+            and session.mtime_ns == stat.st_mtime_ns
+        ):
+            return session
+        return None
+
+    def _persist(self, session: UploadSession):
+        if self.session_store:
+            self.session_store.save(session)
+
+    def create_session(self, metadata: dict, size: int | None, content_type: str) -> str:
+        """Start a resumable session and return its URI"""
+        headers = {
+            **self.authorize(),
+            'Content-Type': 'application/json; charset=UTF-8',
+            'X-Upload-Content-Type': content_type
+        }
+        if size is not None:
+            headers['X-Upload-Content-Length'] = str(size)
+
+        response = self._request('POST', self.upload_url, headers=headers, data=json.dumps(metadata))
+        response.raise_for_status()
+        return response.headers['Location']
+
+    def query_offset(self, session_uri: str, size: int | None) -> int:
+        """Ask the server how many bytes it has committed"""
+        response = self._status(session_uri, size)
+        if response.status_code in (200, 201):
+            # Already complete
+            return size
+        return self._committed(response)
+
+    def _status(self, session_uri: str, size: int | None) -> requests.Response:
+        """Empty PUT asking for the session state; returns a 308 or a completed 200/201"""
+        headers = {
+            **self.authorize(),
+            'Content-Length': '0',
+            'Content-Range': f"bytes */{size if size is not None else '*'}"
+        }
+        started = time.perf_counter()
+        response = self._request('PUT', session_uri, headers=headers)
+        self.chunker.record_latency(time.perf_counter() - started)
+
+        if response.status_code in (404, 410):
+            raise UploadSessionExpiredError(session_uri)
+        if response.status_code in (200, 201, 308):
+            return response
+        response.raise_for_status()
+        raise RuntimeError(f"Unexpected status {response.status_code} querying upload")
+
+    @staticmethod
+    def _committed(response: requests.Response) -> int:
+        """Bytes committed according to a 308's Range header (absent = none)"""
+        committed = response.headers.get('Range')
+        if not committed:
+            return 0
+        return int(committed.rsplit('-', 1)[1]) + 1
+
+    def _send(self, session: UploadSession, f, offset: int) -> dict:
+        """Send chunks from offset until the server returns the resource"""
+        total = session.size
+        while True:
+            f.seek(offset)
+            data = f.read(self.chunker.size)
+            offset, result = self._put(session.session_uri, data, offset, total)
+            if result is not None:
+                if self.on_progress:
+                    self.on_progress(total, total)
+                return result
+
+            session.offset = offset
+            self._persist(session)
+            if self.on_progress:
+                self.on_progress(offset, total)
+
+    def _put(self, session_uri: str, data: bytes, offset: int, total: int | None) -> tuple[int, dict | None]:
+        """
+        Send one chunk, retrying transient failures
+        Args:
+            total: Final size, or None while the source is still growing
+        Returns: (committed offset, resource once the upload is complete)
+            The committed offset may be behind offset + len(data) after a
+            retry; the caller continues from whatever the server has
+        """
+        size = '*' if total is None else total
+        end = offset + len(data) - 1
+        content_range = f"bytes {offset}-{end}/{size}" if data else f"bytes */{size}"
+
+        failures = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self._request(
+                    'PUT',
+                    session_uri,
+                    headers={**self.authorize(), 'Content-Range': content_range},
+                    data=data
+                )
+            except requests.RequestException as e:
+                response = None
+                error = e
+
+            if response is not None and response.status_code in (200, 201):
+                return offset + len(data), response.json()
+            if response is not None and response.status_code == 308:
+                self.chunker.record_chunk(len(data), time.perf_counter() - started)
+                return self._committed(response), None
+            if response is not None and response.status_code in (404, 410):
+                raise UploadSessionExpiredError(session_uri)
+            if response is not None and response.status_code not in RETRYABLE_STATUS:
+                response.raise_for_status()
+                raise RuntimeError(f"Unexpected status {response.status_code} during upload")
+
+            # Interrupted or server error: back off, then ask where to continue
+            failures += 1
+            if failures > self.max_retries:
+                if response is not None:
+                    response.raise_for_status()
+                raise error
+            self.chunker.record_failure()
+            time.sleep(self.backoff * 2 ** (failures - 1) * random.uniform(0.5, 1.5))
+            try:
+                status = self._status(session_uri, total)
+            except requests.RequestException:
+                continue
+            if status.status_code in (200, 201):
+                return offset + len(data), status.json()
+            return self._committed(status), None
+
+    def upload_growing(
+        self,
+        file_path: str,
+        metadata: dict,
+        is_finished: Callable[[], bool],
+        content_type: str = 'video/*',
+        poll_interval: float = 0.5
+    ) -> dict:
+        """
+        Upload a file while another process is still writing it
+        Only bytes inside complete top-level MP4 boxes are sent, so the
+        writer must never rewrite earlier bytes (fragmented MP4). The final
+        size is declared with the last chunk, once is_finished() is true.
+        The session is not persisted: a restarted writer may produce
+        different bytes.
+        Args:
+            file_path: Output file of the running encoder
+            metadata: JSON resource body sent when the session is created
+            is_finished: True once the writer has closed the file
+            content_type: MIME type of the media
+            poll_interval: Seconds between checks for new data
+        Returns: JSON resource returned by the server
+        """
+        session_uri = self.create_session(metadata, None, content_type)
+        boxes = Mp4BoxScanner()
+        offset = 0
+
+        while True:
+            # Check before measuring so a finished writer's size is final
+            finished = is_finished()
+            size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+
+            if finished:
+                with open(file_path, 'rb') as f:
+                    while True:
+                        f.seek(offset)
+                        data = f.read(self.chunker.size)
+                        last = offset + len(data) >= size
+                        if not last:
+                            # Every chunk but the last stays on the 256 KiB grid
+                            data = data[:len(data) // CHUNK_GRANULARITY * CHUNK_GRANULARITY]
+                        offset, result = self._put(session_uri, data, offset, size if last else None)
+                        if result is not None:
+                            if self.on_progress:
+                                self.on_progress(size, size)
+                            return result
+                        if self.on_progress:
+                            self.on_progress(offset, size)
+
+            ready = boxes.complete_until(file_path)
+            sendable = (ready - offset) // CHUNK_GRANULARITY * CHUNK_GRANULARITY
+            if sendable < self.chunker.size:
+                time.sleep(poll_interval)
+                continue
+
+            with open(file_path, 'rb') as f:
+                f.seek(offset)
+                data = f.read(min(sendable, self.chunker.size))
+            offset, _ = self._put(session_uri, data, offset, None)
+            if self.on_progress:
+                self.on_progress(offset, 0)
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        self.requests_sent += 1
+        return self.http.request(method, url, timeout=(10, 300), **kwargs)
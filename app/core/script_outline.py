@@ -0,0 +1,101 @@
+"""
+Script Outline Module
+Splits an episode into independently writable sections (intro, one per
+news item, wrap-up) and stitches the written sections back together
+"""
+import re
+from dataclasses import dataclass
+
+# "## ニュース1: タイトル" headings produced by the news_search prompt; deeper
+# headings ("### 詳細") stay part of their item
+_NEWS_HEADING = re.compile(r'^##[ \t]*ニュース[ \t]*\d+[ \t]*[:：][ \t]*(.*?)[ \t]*$', re.MULTILINE)
+# Any level-2 heading ends the news item before it (e.g. a closing "## まとめ")
+_SECTION_HEADING = re.compile(r'^##(?!#)', re.MULTILINE)
+# Opening / closing phrases that only belong at the very start / end of an episode
+_GREETING = re.compile(r'^(皆さん、?|みなさん、?)?(こんにちは|こんばんは|おはようございます|はじめまして)')
+_SIGN_OFF = re.compile(r'(ご視聴ありがとうございました|また次回|チャンネル登録)')
+# A line ending in a comma or connective visibly continues into the next one
+_CONTINUES = re.compile(r'([、，,]|けど|けれど|ので|ですが|ますが)$')
+
+INTRO_SHARE = 0.08
+OUTRO_SHARE = 0.08
+
+
+@dataclass
+class OutlineSection:
+    """One section of the episode outline"""
+
+    key: str
+    kind: str  # 'intro', 'news' or 'outro'
+    title: str
+    brief: str
+    target_chars: int
+
+
+def build_outline(news_summary: str, total_chars: int = 7500) -> list[OutlineSection]:
+    """
+    Derive the episode outline from a news_search summary
+    Returns an empty list when the summary has no news headings, in which
+    case the episode cannot be sectioned
+    """
+    headings = list(_NEWS_HEADING.finditer(news_summary))
+    if not headings:
+        return []
+
+    items = []
+    for heading in headings:
+        next_heading = _SECTION_HEADING.search(news_summary, heading.end())
+        end = next_heading.start() if next_heading else len(news_summary)
+        title = heading.group(1).strip('[] ')
+        items.append((title, news_summary[heading.end():end].strip()))
+
+    titles = '\n'.join(f"- {title}" for title, _ in items)
+    news_chars = int(total_chars * (1 - INTRO_SHARE - OUTRO_SHARE) / len(items))
+    return [
+        OutlineSection('intro', 'intro', '導入', f"今日取り上げるニュース:\n{titles}", int(total_chars * INTRO_SHARE)),
+        *(
+            OutlineSection(f"news{i}", 'news', title, brief, news_chars)
+            for i, (title, brief) in enumerate(items, 1)
+        ),
+        OutlineSection('outro', 'outro', 'まとめ', f"振り返るニュース:\n{titles}", int(total_chars * OUTRO_SHARE))
+    ]
+
+
+def stitch_sections(sections: list[OutlineSection], lines: list[list[dict]]) -> tuple[list[dict], list[str]]:
+    """
+    Join per-section {speaker, text} lines into one script
+    Repairs the seams sections written in parallel tend to have: greetings
+    after the intro, sign-offs before the wrap-up, a line repeated across a
+    boundary, and a line ending in 、 or a connective that the same speaker
+    continues in the next section. Lines merely lacking 。 are left alone;
+    conversational lines often end without it
+    Returns: (stitched lines, descriptions of the repairs made)
+    """
+    stitched: list[dict] = []
+    repairs: list[str] = []
+
+    for section, section_lines in zip(sections, lines):
+        section_lines = list(section_lines)
+
+        if section.kind != 'intro':
+            while section_lines and _GREETING.match(section_lines[0]['text']):
+                repairs.append(f"{section.key}: dropped repeated greeting")
+                section_lines.pop(0)
+        if section.kind != 'outro':
+            while section_lines and _SIGN_OFF.search(section_lines[-1]['text']):
+                repairs.append(f"{section.key}: dropped early sign-off")
+                section_lines.pop()
+
+        if stitched and section_lines:
+            previous, first = stitched[-1], section_lines[0]
+            if previous['text'] == first['text']:
+                repairs.append(f"{section.key}: dropped line repeated across boundary")
+                section_lines.pop(0)
+            elif previous['speaker'] == first['speaker'] and _CONTINUES.search(previous['text']):
+                repairs.append(f"{section.key}: joined sentence split across boundary")
+                stitched[-1] = {'speaker': previous['speaker'], 'text': f"{previous['text']}{first['text']}"}
+                section_lines.pop(0)
+
+        stitched.extend(section_lines)
+
+    return stitched, repairs
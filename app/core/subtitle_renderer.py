@@ -0,0 +1,227 @@
+"""
+Subtitle Renderer Module
+Rasterises captions once with Pillow and composites them only when the
+visible caption changes
+"""
+import bisect
+import math
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from config import config
+from .thumbnail import FONT_PATHS
+
+# Characters a caption font must have glyphs for
+_CJK_PROBE = 'あア漢'
+# Private-use code point: drawn with the font's missing-glyph box
+_MISSING_GLYPH = '\ue000'
+
+
+class SubtitleFontError(RuntimeError):
+    """No Japanese-capable font is available for captions"""
+
+
+_subtitle_font = None
+_subtitle_font_checked = False
+_subtitle_font_lock = threading.Lock()
+
+
+def _has_cjk_glyphs(font: ImageFont.FreeTypeFont) -> bool:
+    """Whether every probe character renders as something other than the missing-glyph box"""
+    missing = font.getmask(_MISSING_GLYPH)
+    missing = (missing.size, bytes(missing))
+    for char in _CJK_PROBE:
+        mask = font.getmask(char)
+        if (mask.size, bytes(mask)) == missing:
+            return False
+    return True
+
+
+def find_subtitle_font() -> str | None:
+    """
+    Path of a TrueType font that can draw Japanese captions, checked once
+    per process: SUBTITLE_FONT if set, otherwise the first usable FONT_PATHS
+    entry. Pillow's bitmap default font is never used; it cannot encode
+    Japanese text
+    """
+    global _subtitle_font, _subtitle_font_checked
+    with _subtitle_font_lock:
+        if not _subtitle_font_checked:
+            candidates = [config.SUBTITLE_FONT] if config.SUBTITLE_FONT else FONT_PATHS
+            for path in candidates:
+                try:
+                    usable = _has_cjk_glyphs(ImageFont.truetype(path, 20))
+                except (OSError, UnicodeError):
+                    usable = False
+                if usable:
+                    _subtitle_font = path
+                    break
+                if config.SUBTITLE_FONT:
+                    print(f"⚠️  SUBTITLE_FONT {path} is missing or cannot draw Japanese text")
+            _subtitle_font_checked = True
+        return _subtitle_font
+
+
+@dataclass(frozen=True)
+class SubtitleStyle:
+    """Caption appearance; part of the bitmap cache key"""
+
+    font_size: int = 40
+    color: tuple = (255, 255, 255, 255)
+    bg_color: tuple = (0, 0, 0, 255)
+    max_width: int = 1820
+    padding: int = 10
+    line_spacing: int = 6
+    font_path: str = None
+
+
+class SubtitleRenderer:
+    """Renders caption text to RGBA bitmaps, caching by text and style"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._bitmaps: dict[tuple, np.ndarray] = {}
+        self._fonts = {}
+        self._lock = threading.Lock()
+
+    def render(self, text: str, style: SubtitleStyle) -> np.ndarray:
+        """Get the RGBA bitmap for a caption, rendering it on first use"""
+        key = (text, style)
+        with self._lock:
+            bitmap = self._bitmaps.get(key)
+            if bitmap is not None:
+                # Re-insert so dict order tracks recency
+                self._bitmaps[key] = self._bitmaps.pop(key)
+                return bitmap
+
+        bitmap = self._rasterise(text, style)
+        with self._lock:
+            self._bitmaps[key] = bitmap
+            while len(self._bitmaps) > self.max_entries:
+                del self._bitmaps[next(iter(self._bitmaps))]
+        return bitmap
+
+    def _font(self, style: SubtitleStyle):
+        key = (style.font_path, style.font_size)
+        if key not in self._fonts:
+            path = style.font_path or find_subtitle_font()
+            if path is None:
+                raise SubtitleFontError(
+                    "No Japanese-capable font found for subtitles; set SUBTITLE_FONT to a CJK "
+                    "TrueType/OpenType font (e.g. NotoSansCJK-Regular.ttc) or SUBTITLES_ENABLED=false"
+                )
+            self._fonts[key] = ImageFont.truetype(path, style.font_size)
+        return self._fonts[key]
+
+    def _rasterise(self, text: str, style: SubtitleStyle) -> np.ndarray:
+        font = self._font(style)
+        wrapped = self._wrap_text(text, font, style.max_width - 2 * style.padding)
+
+        measure = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+        left, top, right, bottom = measure.multiline_textbbox(
+            (0, 0), wrapped, font=font, spacing=style.line_spacing, align='center'
+        )
+        width = math.ceil(right - left) + 2 * style.padding
+        height = math.ceil(bottom - top) + 2 * style.padding
+
+        img = Image.new('RGBA', (width, height), style.bg_color)
+        ImageDraw.Draw(img).multiline_text(
+            (style.padding - left, style.padding - top),
+            wrapped,
+            font=font,
+            fill=style.color,
+            spacing=style.line_spacing,
+            align='center'
+        )
+        return np.asarray(img)
+
+    def _wrap_text(self, text: str, font, max_width: int) -> str:
+        """Wrap per character so Japanese text without spaces still breaks"""
+        lines = []
+        current = ''
+        for char in text:
+            if current and font.getlength(current + char) > max_width:
+                lines.append(current)
+                current = char
+            else:
+                current += char
+        if current:
+            lines.append(current)
+        return '\n'.join(lines)
+
+
+class SubtitleCompositor:
+    """Frame source that overlays captions on a static background"""
+
+    def __init__(
+        self,
+        background: np.ndarray,
+        subtitles: list[dict],
+        renderer: SubtitleRenderer,
+        style: SubtitleStyle,
+        bottom_margin: int = 150
+    ):
+        """
+        Args:
+            background: RGB frame at output resolution
+            subtitles: List of {text, start, end} dicts
+            renderer: Bitmap cache shared across videos
+            style: Caption style
+            bottom_margin: Distance from the frame bottom to the caption top
+        """
+        self.background = background
+        self.renderer = renderer
+        self.style = style
+        self.bottom_margin = bottom_margin
+
+        # Boundaries split the timeline into intervals with a fixed caption
+        captions = sorted(subtitles, key=lambda sub: sub['start'])
+        self._times = []
+        self._texts = []
+        for sub in captions:
+            self._add_interval(sub['start'], sub['text'])
+            self._add_interval(sub['end'], None)
+
+        self._last_interval = None
+        self._last_frame = background
+        self._lock = threading.Lock()
+
+    def _add_interval(self, time: float, text: str | None):
+        if self._times and time <= self._times[-1]:
+            # Touching or overlapping captions: the next one takes over at this boundary
+            if text is not None or self._texts[-1] is None:
+                self._texts[-1] = text
+            return
+        self._times.append(time)
+        self._texts.append(text)
+
+    def frame_at(self, t: float) -> np.ndarray:
+        """MoviePy frame function; composites only at caption boundaries"""
+        interval = bisect.bisect_right(self._times, t) - 1
+        with self._lock:
+            if interval != self._last_interval:
+                text = self._texts[interval] if interval >= 0 else None
+                self._last_frame = self._composite(text) if text else self.background
+                self._last_interval = interval
+            return self._last_frame
+
+    def _composite(self, text: str) -> np.ndarray:
+        """Alpha-blend one caption onto a copy of the background"""
+        bitmap = self.renderer.render(text, self.style)
+        frame = self.background.copy()
+        frame_height, frame_width = frame.shape[:2]
+
+        height, width = bitmap.shape[:2]
+        height = min(height, frame_height)
+        width = min(width, frame_width)
+        x = (frame_width - width) // 2
+        y = max(0, min(frame_height - self.bottom_margin, frame_height - height))
+
+        alpha = bitmap[:height, :width, 3:4].astype(np.float32) / 255.0
+        region = frame[y:y + height, x:x + width].astype(np.float32)
+        blended = bitmap[:height, :width, :3] * alpha + region * (1.0 - alpha)
+        frame[y:y + height, x:x + width] = blended.astype(np.uint8)
+        return frame
@@ -0,0 +1,67 @@
+"""
+Subtitle Timeline Module
+Builds {text, start, end} captions from per-line audio timings
+"""
+import re
+
+# Preferred places to break a long line, strongest first
+_BREAK_PATTERN = re.compile(r'(?<=[。！？!?])|(?<=[、，,])')
+
+
+def split_caption_text(text: str, max_chars: int = 30) -> list[str]:
+    """
+    Split a dialogue line into readable caption chunks
+    Breaks after sentence or clause punctuation when possible and hard-wraps
+    anything still longer than max_chars
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    chunks = []
+    current = ''
+    for piece in _BREAK_PATTERN.split(text):
+        if not piece:
+            continue
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ''
+        current += piece
+        while len(current) > max_chars:
+            chunks.append(current[:max_chars])
+            current = current[max_chars:]
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_subtitles(script_lines: list[dict], timings: list[dict], max_chars: int = 30) -> list[dict]:
+    """
+    Build the subtitle list for VideoGenerator.create_video
+    Args:
+        script_lines: Parsed {speaker, text} lines
+        timings: Per-line {index, start, end} offsets from concatenation
+        max_chars: Maximum characters per caption
+    Returns: List of {text, start, end} dicts, each line's time shared
+        across its chunks in proportion to character count
+    """
+    subtitles = []
+    for timing in timings:
+        index = timing['index']
+        if index is None or index >= len(script_lines):
+            continue
+
+        chunks = split_caption_text(script_lines[index]['text'], max_chars)
+        total_chars = sum(len(chunk) for chunk in chunks)
+        if not total_chars:
+            continue
+
+        start = timing['start']
+        per_char = (timing['end'] - timing['start']) / total_chars
+        for chunk in chunks:
+            end = start + len(chunk) * per_char
+            subtitles.append({'text': chunk, 'start': start, 'end': end})
+            start = end
+
+    return subtitles
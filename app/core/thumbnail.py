@@ -4,22 +4,46 @@ Creates attractive YouTube thumbnails
 """
 from PIL import Image, ImageDraw, ImageFont
 from pathlib import Path
-import tempfile
+
+from .workspace import Workspace
+
+# Japanese-capable fonts, tried in order
+FONT_PATHS = [
+    "/System/Library/Fonts/ヒラギノ角ゴシック W6.ttc",  # macOS
+    "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",  # Linux
+    "C:\\Windows\\Fonts\\msgothic.ttc",  # Windows
+]
+
+
+def load_font(size: int, font_path: str = None) -> ImageFont:
+    """Load a Japanese-capable font, falling back to Pillow's default"""
+    try:
+        candidates = [font_path] if font_path else FONT_PATHS
+        for path in candidates:
+            if Path(path).exists():
+                return ImageFont.truetype(path, size)
+    except Exception as e:
+        print(f"⚠️  Font loading failed: {e}, using default")
+
+    # Fallback to default font
+    return ImageFont.load_default()
 
 
 class ThumbnailGenerator:
     """YouTube thumbnail generator"""
 
-    def __init__(self, width: int = 1280, height: int = 720):
+    def __init__(self, width: int = 1280, height: int = 720, workspace: Workspace = None):
         self.width = width
         self.height = height
+        # Default output location comes from the run workspace when given
+        self.workspace = workspace
 
     def create_thumbnail(
         self,
         title: str,
         background_color: tuple = (30, 30, 50),
         text_color: tuple = (255, 255, 255),
-        output_file: str = "thumbnail.jpg"
+        output_file: str = None
     ) -> str:
         """
         Create simple text thumbnail
@@ -27,36 +51,18 @@ class ThumbnailGenerator:
             title: Thumbnail text
             background_color: RGB background color
             text_color: RGB text color
-            output_file: Output file path
+            output_file: Output file path (default: workspace thumbnail file)
         Returns: Path to thumbnail image
         """
+        if output_file is None:
+            output_file = str(self.workspace.thumbnail_file) if self.workspace else "thumbnail.jpg"
         print(f"🖼️  Creating thumbnail: {title}")
 
         # Create image
         img = Image.new('RGB', (self.width, self.height), background_color)
         draw = ImageDraw.Draw(img)
 
-        # Try to load font
-        try:
-            # Try to use a Japanese font if available
-            font_paths = [
-                "/System/Library/Fonts/ヒラギノ角ゴシック W6.ttc",  # macOS
-                "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",  # Linux
-                "C:\\Windows\\Fonts\\msgothic.ttc",  # Windows
-            ]
-
-            font = None
-            for font_path in font_paths:
-                if Path(font_path).exists():
-                    font = ImageFont.truetype(font_path, 60)
-                    break
-
-            if font is None:
-                # Fallback to default font
-                font = ImageFont.load_default()
-        except Exception as e:
-            print(f"⚠️  Font loading failed: {e}, using default")
-            font = ImageFont.load_default()
+        font = load_font(60)
 
         # Word wrap title
         wrapped_text = self._wrap_text(title, font, self.width - 100)
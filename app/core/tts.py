@@ -2,94 +2,158 @@
 Text-to-Speech Module using Google Gemini
 Converts script text to audio files
 """
-import google.generativeai as genai
 from pathlib import Path
+from typing import Iterable
 from config import config
-import time
+from .tts_engine import RateLimiter, SynthesisEngine
+from .tts_cache import UtteranceCache
+from .wav_concat import concatenate_wavs
+from .workspace import Workspace
+from .clients import ClientRegistry, get_client_registry
+import wave
 
 class GeminiTTS:
     """Google Gemini Text-to-Speech converter"""
 
-    def __init__(self):
-        genai.configure(api_key=config.GEMINI_API_KEY)
+    def __init__(
+        self,
+        voice_ids: dict = None,
+        workers: int = None,
+        limiter: RateLimiter = None,
+        cache: UtteranceCache = None,
+        workspace: Workspace = None,
+        clients: ClientRegistry = None
+    ):
+        self.genai = (clients or get_client_registry()).configure_gemini()
+        self.voice_ids = voice_ids or {}
+        # Default output locations come from the run workspace when given
+        self.workspace = workspace
+        self.engine = SynthesisEngine(
+            self._synthesize_line,
+            workers=workers,
+            limiter=limiter,
+            cache=cache,
+            cache_key=self._cache_key
+        )
+
+    def _cache_key(self, line: dict) -> str:
+        voice = self.voice_ids.get(line['speaker'], "default")
+        return UtteranceCache.make_key('gemini', voice, line['speaker'], line['text'])
 
-    def generate_audio(self, script_lines: list[dict], output_dir: str = "temp") -> list[str]:
+    def generate_audio(self, script_lines: Iterable[dict], output_dir: str = None) -> list[str]:
         """
         Generate audio files from script lines
+        Lines are synthesised concurrently within the configured rate limits
         Args:
-            script_lines: List of {speaker, text} dicts
-            output_dir: Directory to save audio files
-        Returns: List of audio file paths
+            script_lines: {speaker, text} dicts; may be a live stream of lines
+            output_dir: Directory to save audio files (default: workspace audio dir)
+        Returns: List of audio file paths in script order
         """
+        if output_dir is None:
+            output_dir = str(self.workspace.audio_dir) if self.workspace else "temp"
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
 
-        audio_files = []
-
-        for idx, line in enumerate(script_lines):
-            speaker = line['speaker']
-            text = line['text']
-
-            # Skip empty lines
-            if not text.strip():
-                continue
-
-            # Generate audio for this line
-            audio_path = output_path / f"audio_{idx:04d}_{speaker}.wav"
+        def jobs():
+            for idx, line in enumerate(script_lines):
+                # Skip empty lines
+                if not line['text'].strip():
+                    continue
+                yield idx, line, output_path / f"audio_{idx:04d}_{line['speaker']}.wav"
 
-            try:
-                # Note: Gemini doesn't have direct TTS yet
-                # This is a placeholder for future implementation
-                # You might want to use:
-                # - Google Cloud Text-to-Speech API
-                # - ElevenLabs API
-                # - Other TTS services
+        return self.engine.run(jobs())
 
-                print(f"🎤 Generating audio {idx}: {speaker} - {text[:50]}...")
+    def _synthesize_line(self, line: dict, audio_path: Path):
+        """Generate audio for a single line"""
+        # Note: Gemini doesn't have direct TTS yet
+        # This is a placeholder for future implementation
+        # You might want to use:
+        # - Google Cloud Text-to-Speech API
+        # - ElevenLabs API
+        # - Other TTS services
 
-                # Placeholder: Create empty WAV file
-                # TODO: Replace with actual TTS API call
-                self._create_placeholder_audio(audio_path, text)
+        print(f"🎤 Generating audio: {line['speaker']} - {line['text'][:50]}...")
 
-                audio_files.append(str(audio_path))
-                time.sleep(0.1)  # Rate limiting
+        # Placeholder: Create empty WAV file
+        # TODO: Replace with actual TTS API call
+        self._create_placeholder_audio(audio_path, line['text'])
 
-            except Exception as e:
-                print(f"❌ Failed to generate audio for line {idx}: {e}")
-                continue
-
-        return audio_files
-
-    def _create_placeholder_audio(self, path: Path, text: str):
+    def _create_placeholder_audio(self, path: Path, text: str, sample_rate: int = 24000):
         """Create placeholder audio file (for testing)"""
         # This is just a placeholder
         # Replace with actual TTS implementation
-        path.write_text(f"Audio placeholder for: {text}")
-
-    def concatenate_audio(self, audio_files: list[str], output_file: str = "final_audio.wav") -> str:
+        # Silent 16-bit mono WAV, roughly as long as the line would take to read
+        duration = max(0.5, len(text) * 0.12)
+        with wave.open(str(path), 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(b'\x00\x00' * int(duration * sample_rate))
+
+    def concatenate_audio(
+        self,
+        audio_files: list[str],
+        output_file: str = None,
+        speaker_gap: float = None,
+        line_gap: float = None,
+        return_timings: bool = False
+    ) -> str | tuple[str, list[dict]]:
         """
         Concatenate multiple audio files into one
+        Sample data is streamed straight into the output without decoding
         Args:
             audio_files: List of audio file paths
-            output_file: Output file path
-        Returns: Path to concatenated audio file
+            output_file: Output file path (default: workspace audio file)
+            speaker_gap: Silence in seconds when the speaker changes
+            line_gap: Silence in seconds between lines of the same speaker
+            return_timings: Also return per-line {file, index, speaker, start, end} offsets
+        Returns: Path to concatenated audio file (and timings if requested)
         """
-        # TODO: Use pydub or ffmpeg to concatenate audio
+        if output_file is None:
+            output_file = str(self.workspace.audio_file) if self.workspace else "final_audio.wav"
         print(f"🔗 Concatenating {len(audio_files)} audio files...")
 
-        # Placeholder implementation
-        output_path = Path(output_file)
-        output_path.write_text("Concatenated audio placeholder")
+        output_path, timings = concatenate_wavs(
+            audio_files,
+            output_file,
+            speaker_gap=config.TTS_SPEAKER_GAP if speaker_gap is None else speaker_gap,
+            line_gap=config.TTS_LINE_GAP if line_gap is None else line_gap
+        )
 
-        return str(output_path)
+        if return_timings:
+            return output_path, timings
+        return output_path
 
 
 class ElevenLabsTTS:
     """ElevenLabs TTS (alternative implementation)"""
 
-    def __init__(self):
-        from elevenlabs import Voice, VoiceSettings, generate
+    def __init__(
+        self,
+        voice_ids: dict = None,
+        api_url: str = None,
+        workers: int = None,
+        limiter: RateLimiter = None,
+        cache: UtteranceCache = None,
+        clients: ClientRegistry = None
+    ):
         self.api_key = config.ELEVENLABS_API_KEY
+        # Pooled keep-alive connections shared with other REST clients
+        self.http = (clients or get_client_registry()).http
+        # Overridable so the client can be pointed at a local fake server
+        self.api_url = (api_url or config.ELEVENLABS_API_URL).rstrip('/')
+        self.voice_ids = voice_ids or {}
+        self.engine = SynthesisEngine(
+            self._synthesize_line,
+            workers=workers,
+            limiter=limiter,
+            cache=cache,
+            cache_key=self._cache_key
+        )
+
+    def _cache_key(self, line: dict) -> str:
+        voice = self.voice_ids.get(line['speaker'], "default")
+        return UtteranceCache.make_key('elevenlabs', voice, line['speaker'], line['text'])
 
     def generate_audio(self, text: str, voice_id: str = "default", output_file: str = "output.mp3") -> str:
         """
@@ -100,16 +164,40 @@ class ElevenLabsTTS:
             output_file: Output file path
         Returns: Path to audio file
         """
-        from elevenlabs import generate, save
-
-        # Generate audio
-        audio = generate(
-            text=text,
-            voice=voice_id,
-            api_key=self.api_key
-        )
+        self._request_audio(text, voice_id, Path(output_file))
+        return output_file
 
-        # Save to file
-        save(audio, output_file)
+    def generate_script_audio(self, script_lines: Iterable[dict], output_dir: str = "temp") -> list[str]:
+        """
+        Generate one audio file per script line concurrently
+        Args:
+            script_lines: {speaker, text} dicts; speakers map to voices via voice_ids
+            output_dir: Directory to save audio files
+        Returns: List of audio file paths in script order
+        """
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
 
-        return output_file
+        def jobs():
+            for idx, line in enumerate(script_lines):
+                if not line['text'].strip():
+                    continue
+                yield idx, line, output_path / f"audio_{idx:04d}_{line['speaker']}.mp3"
+
+        return self.engine.run(jobs())
+
+    def _synthesize_line(self, line: dict, audio_path: Path):
+        """Generate audio for a single line with the speaker's voice"""
+        voice_id = self.voice_ids.get(line['speaker'], "default")
+        self._request_audio(line['text'], voice_id, audio_path)
+
+    def _request_audio(self, text: str, voice_id: str, output_path: Path):
+        """Call the text-to-speech endpoint and write the returned audio"""
+        response = self.http.post(
+            f"{self.api_url}/v1/text-to-speech/{voice_id}",
+            headers={'xi-api-key': self.api_key, 'Accept': 'audio/mpeg'},
+            json={'text': text},
+            timeout=60
+        )
+        response.raise_for_status()
+        output_path.write_bytes(response.content)
@@ -0,0 +1,140 @@
+"""
+TTS Utterance Cache
+Persistent cache of synthesised clips keyed by provider, voice, speaker
+and normalised text
+"""
+import contextlib
+import hashlib
+import os
+import re
+import shutil
+import threading
+import unicodedata
+from pathlib import Path
+
+from config import config
+
+
+def normalize_text(text: str) -> str:
+    """Normalise text so trivially different spellings share a clip"""
+    text = unicodedata.normalize('NFKC', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class UtteranceCache:
+    """Size-capped LRU cache of audio clips on local disk"""
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = Path(cache_dir or config.TTS_CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else config.TTS_CACHE_MAX_MB * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Running size estimate so eviction only scans when over budget
+        self._size = self._scan_size()
+
+    @staticmethod
+    def make_key(provider: str, voice: str, speaker: str, text: str) -> str:
+        """Hash the parts of a line that determine its audio"""
+        payload = '\0'.join([provider, voice, speaker, normalize_text(text)])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{suffix}"
+
+    def fetch(self, key: str, output_path: Path) -> bool:
+        """
+        Copy a cached clip to output_path
+        A copy rather than a hard link: a later in-place write to the run's
+        file must never reach the shared cache entry
+        Returns: True on hit, False on miss
+        """
+        cached = self._path(key, output_path.suffix)
+        output_path.unlink(missing_ok=True)
+        try:
+            shutil.copyfile(cached, output_path)
+        except FileNotFoundError:
+            # Not cached, or evicted by another run while copying
+            self._count(hit=False)
+            return False
+
+        # Bump mtime so eviction treats this clip as recently used
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(cached)
+        self._count(hit=True)
+        return True
+
+    def store(self, key: str, audio_path: Path):
+        """Add a freshly synthesised clip to the cache"""
+        cached = self._path(key, audio_path.suffix)
+        cached.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = cached.with_name(f"{cached.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(audio_path, tmp_path)
+        os.replace(tmp_path, cached)
+
+        with self._lock:
+            self._size += cached.stat().st_size
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """(mtime, size, path) for every cached clip"""
+        entries = []
+        for path in self.cache_dir.glob('*/*'):
+            if path.name.endswith('.tmp'):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Remove least recently used clips until under max_bytes"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+        with self._lock:
+            self._size = total
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters since the cache was created"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+
+_utterance_cache = None
+_utterance_cache_lock = threading.Lock()
+
+
+def get_utterance_cache() -> UtteranceCache:
+    """Get the process-wide utterance cache"""
+    global _utterance_cache
+    with _utterance_cache_lock:
+        if _utterance_cache is None:
+            _utterance_cache = UtteranceCache()
+        return _utterance_cache
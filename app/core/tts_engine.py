@@ -0,0 +1,162 @@
+"""
+TTS Synthesis Engine
+Synthesises dialogue lines concurrently under provider rate limits
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable
+
+from config import config
+from .tts_cache import UtteranceCache
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0):
+        """Block until `amount` tokens are available, then take them"""
+        # A single request larger than the bucket still has to go through
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Combined requests-per-second and characters-per-minute quota"""
+
+    def __init__(self, requests_per_second: float = 0, chars_per_minute: float = 0):
+        self.requests = TokenBucket(requests_per_second, max(1.0, requests_per_second)) if requests_per_second else None
+        self.chars = TokenBucket(chars_per_minute / 60, chars_per_minute) if chars_per_minute else None
+
+    def acquire(self, chars: int):
+        """Block until one request of `chars` characters fits both quotas"""
+        if self.requests:
+            self.requests.acquire(1)
+        if self.chars:
+            self.chars.acquire(chars)
+
+
+class SynthesisEngine:
+    """Concurrent line synthesiser with rate limiting and per-line retries"""
+
+    def __init__(
+        self,
+        synthesize: Callable[[dict, Path], None],
+        workers: int = None,
+        limiter: RateLimiter = None,
+        max_retries: int = None,
+        backoff: float = 1.0,
+        cache: UtteranceCache = None,
+        cache_key: Callable[[dict], str] = None
+    ):
+        """
+        Args:
+            synthesize: Callable that writes audio for one {speaker, text} line to a path
+            workers: Number of concurrent synthesis requests
+            limiter: Provider quota; defaults to the TTS_* settings
+            max_retries: Retries per line after the first attempt
+            backoff: Base delay in seconds for exponential backoff
+            cache: Utterance cache consulted before synthesising (optional)
+            cache_key: Callable mapping a line to its cache key; required with cache
+        """
+        self.synthesize = synthesize
+        self.workers = workers or config.TTS_WORKERS
+        self.limiter = limiter or RateLimiter(
+            config.TTS_REQUESTS_PER_SECOND,
+            config.TTS_CHARS_PER_MINUTE
+        )
+        self.max_retries = config.TTS_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = backoff
+        self.cache = cache
+        self.cache_key = cache_key
+        self.last_run_stats = {}
+
+    def run(self, jobs: Iterable[tuple[int, dict, Path]]) -> list[str]:
+        """
+        Synthesise every job
+        Args:
+            jobs: (idx, line, path) tuples; may be a live stream
+        Returns: Paths of successfully generated files, ordered by idx
+        """
+        results = {}
+        counts = {'cache_hits': 0, 'synthesised': 0, 'failed': 0}
+        counts_lock = threading.Lock()
+        # Bound in-flight work so a live stream is not drained into memory
+        slots = threading.Semaphore(self.workers * 2)
+
+        def task(idx: int, line: dict, path: Path):
+            try:
+                try:
+                    outcome = self._process_line(idx, line, path)
+                except Exception as e:
+                    # Cache or quota errors would otherwise vanish into an unread future
+                    print(f"❌ Failed to generate audio for line {idx}: {e}")
+                    outcome = 'failed'
+                if outcome != 'failed':
+                    results[idx] = str(path)
+                with counts_lock:
+                    counts[outcome] += 1
+            finally:
+                slots.release()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='tts') as executor:
+            for idx, line, path in jobs:
+                slots.acquire()
+                executor.submit(task, idx, line, path)
+
+        total = sum(counts.values())
+        self.last_run_stats = {
+            **counts,
+            'cache_hit_rate': counts['cache_hits'] / total if total else 0.0
+        }
+        if self.cache:
+            print(f"💾 TTS cache: {counts['cache_hits']}/{total} lines reused")
+
+        return [results[idx] for idx in sorted(results)]
+
+    def _process_line(self, idx: int, line: dict, path: Path) -> str:
+        """Reuse a cached clip or synthesise one; returns the outcome name"""
+        key = self.cache_key(line) if self.cache else None
+        if key and self.cache.fetch(key, path):
+            return 'cache_hits'
+
+        if not self._synthesize_with_retry(idx, line, path):
+            return 'failed'
+
+        if key:
+            self.cache.store(key, path)
+        return 'synthesised'
+
+    def _synthesize_with_retry(self, idx: int, line: dict, path: Path) -> bool:
+        """Synthesise one line, retrying with jittered exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(len(line['text']))
+            try:
+                self.synthesize(line, path)
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"❌ Failed to generate audio for line {idx}: {e}")
+                    return False
+                delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                print(f"⚠️  Retrying line {idx} in {delay:.1f}s: {e}")
+                time.sleep(delay)
+        return False
@@ -5,28 +5,59 @@ Creates video files from audio and background images using MoviePy
 from moviepy.editor import (
     ImageClip,
     AudioFileClip,
-    CompositeVideoClip,
-    TextClip,
-    concatenate_videoclips
+    VideoClip
 )
 from pathlib import Path
-import tempfile
+
+import numpy as np
+
+from .ffmpeg_utils import run_ffmpeg, color_to_hex, FASTSTART_MOVFLAGS, FRAGMENTED_MOVFLAGS
+from .subtitle_renderer import SubtitleRenderer, SubtitleCompositor, SubtitleStyle
+from .parallel_render import render_parallel
+from .audio_mix import mix_bgm_audio, remux_with_bgm
+from .backgrounds import BackgroundProvider
+from .workspace import Workspace
+
+# Caption bitmaps and decoded backgrounds are shared by every VideoGenerator in the process
+_subtitle_renderer = SubtitleRenderer()
+_background_provider = BackgroundProvider()
 
 
 class VideoGenerator:
     """Video generator using MoviePy"""
 
-    def __init__(self, width: int = 1920, height: int = 1080, fps: int = 30):
+    def __init__(
+        self,
+        width: int = 1920,
+        height: int = 1080,
+        fps: int = 30,
+        keyframe_interval: int = 10,
+        workers: int = 1,
+        workspace: Workspace = None,
+        fragmented: bool = False
+    ):
         self.width = width
         self.height = height
         self.fps = fps
+        # Encoder processes for subtitle videos; >1 enables segment-parallel rendering
+        self.workers = workers
+        # Seconds between keyframes in still-image mode
+        self.keyframe_interval = keyframe_interval
+        self.subtitle_style = SubtitleStyle(max_width=width - 100)
+        # Default output location comes from the run workspace when given
+        self.workspace = workspace
+        # Fragmented MP4 can be uploaded while it is still being encoded
+        self.movflags = FRAGMENTED_MOVFLAGS if fragmented else FASTSTART_MOVFLAGS
 
     def create_video(
         self,
         audio_file: str,
         background_image: str = None,
         subtitles: list[dict] = None,
-        output_file: str = "output.mp4"
+        output_file: str = None,
+        still_mode: bool = True,
+        bgm_file: str = None,
+        bgm_volume: float = 0.1
     ) -> str:
         """
         Create video from audio and background
@@ -34,31 +65,48 @@ class VideoGenerator:
             audio_file: Path to audio file
             background_image: Path to background image (optional)
             subtitles: List of {text, start, end} dicts (optional)
-            output_file: Output video path
+            output_file: Output video path (default: workspace video file)
+            still_mode: Encode a static timeline directly with FFmpeg
+            bgm_file: Background music mixed in before encoding (optional)
+            bgm_volume: BGM volume (0.0 to 1.0)
         Returns: Path to generated video
         """
+        if output_file is None:
+            output_file = str(self.workspace.video_file) if self.workspace else "output.mp4"
+
+        # Mix BGM into the audio track up front so the video is encoded once
+        if bgm_file:
+            mixed_audio = Path(output_file).with_suffix('.mix.wav')
+            mix_bgm_audio(audio_file, bgm_file, str(mixed_audio), bgm_volume)
+            try:
+                return self.create_video(
+                    str(mixed_audio), background_image, subtitles, output_file, still_mode
+                )
+            finally:
+                mixed_audio.unlink(missing_ok=True)
+
         print(f"🎬 Creating video: {output_file}")
 
+        # A single background with no overlays has no motion, so skip
+        # MoviePy's per-frame compositing entirely
+        if still_mode and not subtitles:
+            return self.create_still_video(audio_file, background_image, output_file)
+
+        if subtitles and self.workers > 1:
+            return self.create_parallel_video(audio_file, background_image, subtitles, output_file)
+
         # Load audio
         audio = AudioFileClip(audio_file)
         duration = audio.duration
 
-        # Create or load background
-        if background_image and Path(background_image).exists():
-            background = ImageClip(background_image).set_duration(duration)
-        else:
-            # Create solid color background
-            background = self._create_solid_background(duration)
-
-        # Resize background to fit dimensions
-        background = background.resize((self.width, self.height))
+        # Background frame is decoded and scaled once, then served from memory
+        frame = self._background_frame(background_image)
 
         # Add subtitles if provided
         if subtitles:
-            subtitle_clips = self._create_subtitle_clips(subtitles)
-            video = CompositeVideoClip([background] + subtitle_clips)
+            video = self._create_subtitle_video(frame, subtitles, duration)
         else:
-            video = background
+            video = ImageClip(frame).set_duration(duration)
 
         # Set audio
         video = video.set_audio(audio)
@@ -69,99 +117,129 @@ class VideoGenerator:
             fps=self.fps,
             codec='libx264',
             audio_codec='aac',
-            temp_audiofile='temp-audio.m4a',
-            remove_temp=True
+            # Next to the output so concurrent runs never share a temp file
+            temp_audiofile=str(Path(output_file).with_suffix('.temp-audio.m4a')),
+            remove_temp=True,
+            ffmpeg_params=['-movflags', self.movflags]
         )
 
         # Clean up
         audio.close()
-        background.close()
-        if subtitles:
-            for clip in subtitle_clips:
-                clip.close()
+        video.close()
 
         print(f"✅ Video created: {output_file}")
         return output_file
 
-    def _create_solid_background(self, duration: float, color: tuple = (30, 30, 50)) -> ImageClip:
-        """Create a solid color background"""
-        from PIL import Image
-        import numpy as np
-
-        # Create image
-        img_array = np.full((self.height, self.width, 3), color, dtype=np.uint8)
-        img = Image.fromarray(img_array)
-
-        # Save to temp file
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
-            img.save(f.name)
-            temp_path = f.name
+    def create_parallel_video(
+        self,
+        audio_file: str,
+        background_image: str = None,
+        subtitles: list[dict] = None,
+        output_file: str = "output.mp4"
+    ) -> str:
+        """
+        Render a subtitle video as segments in parallel and stream-copy concat them
+        Segments are cut at caption starts so no caption is split mid-frame
+        Args:
+            audio_file: Path to audio file
+            background_image: Path to background image (optional)
+            subtitles: List of {text, start, end} dicts
+            output_file: Output video path
+        Returns: Path to generated video
+        """
+        audio = AudioFileClip(audio_file)
+        duration = audio.duration
+        audio.close()
 
-        # Create clip
-        clip = ImageClip(temp_path).set_duration(duration)
-        return clip
+        render_parallel(
+            self._background_frame(background_image),
+            subtitles or [],
+            audio_file,
+            duration,
+            output_file,
+            fps=self.fps,
+            style=self.subtitle_style,
+            workers=self.workers,
+            movflags=self.movflags
+        )
 
-    def _create_subtitle_clips(self, subtitles: list[dict]) -> list[TextClip]:
-        """Create subtitle text clips"""
-        subtitle_clips = []
+        print(f"✅ Video created: {output_file}")
+        return output_file
 
-        for sub in subtitles:
-            text = sub['text']
-            start = sub['start']
-            end = sub['end']
+    def create_still_video(
+        self,
+        audio_file: str,
+        background_image: str = None,
+        output_file: str = "output.mp4",
+        color: tuple = (30, 30, 50)
+    ) -> str:
+        """
+        Encode a still-image video straight from one image and the audio track
+        Args:
+            audio_file: Path to audio file
+            background_image: Path to background image (optional)
+            output_file: Output video path
+            color: Solid background colour used when no image is given
+        Returns: Path to generated video
+        """
+        scale = (
+            f"scale={self.width}:{self.height}:force_original_aspect_ratio=decrease,"
+            f"pad={self.width}:{self.height}:(ow-iw)/2:(oh-ih)/2,format=yuv420p"
+        )
 
-            # Create text clip
-            txt_clip = TextClip(
-                text,
-                fontsize=40,
-                color='white',
-                bg_color='black',
-                size=(self.width - 100, None),
-                method='caption'
-            )
+        if background_image and Path(background_image).exists():
+            video_input = ['-loop', '1', '-framerate', self.fps, '-i', background_image]
+        else:
+            source = f"color=c={color_to_hex(color)}:s={self.width}x{self.height}:r={self.fps}"
+            video_input = ['-f', 'lavfi', '-i', source]
+
+        run_ffmpeg(video_input + [
+            '-i', audio_file,
+            '-map', '0:v:0',
+            '-map', '1:a:0',
+            '-vf', scale,
+            '-c:v', 'libx264',
+            '-tune', 'stillimage',
+            '-preset', 'veryfast',
+            '-g', self.fps * self.keyframe_interval,
+            '-r', self.fps,
+            '-c:a', 'aac',
+            '-b:a', '192k',
+            '-shortest',
+            '-movflags', self.movflags,
+            output_file
+        ])
 
-            # Position at bottom center
-            txt_clip = txt_clip.set_position(('center', self.height - 150))
-            txt_clip = txt_clip.set_start(start).set_end(end)
+        print(f"✅ Video created: {output_file}")
+        return output_file
 
-            subtitle_clips.append(txt_clip)
+    def _background_frame(self, background_image: str = None, color: tuple = (30, 30, 50)) -> np.ndarray:
+        """Get the background as an RGB frame at output resolution"""
+        return _background_provider.frame(self.width, self.height, background_image, color)
 
-        return subtitle_clips
+    def _create_subtitle_video(self, background: np.ndarray, subtitles: list[dict], duration: float) -> VideoClip:
+        """
+        Overlay subtitles on a static background
+        Each caption is rasterised once and composited only at caption
+        boundaries; frames in between reuse the last composited frame
+        """
+        compositor = SubtitleCompositor(
+            background,
+            subtitles,
+            _subtitle_renderer,
+            self.subtitle_style
+        )
+        return VideoClip(compositor.frame_at, duration=duration)
 
     def add_bgm(self, video_file: str, bgm_file: str, bgm_volume: float = 0.1) -> str:
         """
         Add background music to video
+        Only the audio is mixed and re-encoded; the video stream is copied
         Args:
             video_file: Input video path
             bgm_file: Background music path
             bgm_volume: BGM volume (0.0 to 1.0)
         Returns: Path to output video
         """
-        from moviepy.editor import VideoFileClip, AudioFileClip, CompositeAudioClip
-
-        video = VideoFileClip(video_file)
-        bgm = AudioFileClip(bgm_file).volumex(bgm_volume)
-
-        # Loop BGM if shorter than video
-        if bgm.duration < video.duration:
-            bgm = bgm.loop(duration=video.duration)
-        else:
-            bgm = bgm.subclip(0, video.duration)
-
-        # Composite audio
-        if video.audio:
-            final_audio = CompositeAudioClip([video.audio, bgm])
-        else:
-            final_audio = bgm
-
-        video = video.set_audio(final_audio)
-
-        # Output path
         output_file = video_file.replace('.mp4', '_with_bgm.mp4')
-        video.write_videofile(output_file, codec='libx264', audio_codec='aac')
-
-        # Clean up
-        video.close()
-        bgm.close()
-
-        return output_file
+        return remux_with_bgm(video_file, bgm_file, output_file, bgm_volume)
@@ -0,0 +1,199 @@
+"""
+WAV Concatenation Module
+Joins PCM WAV clips without decoding them and records per-clip offsets
+"""
+import mmap
+import os
+import re
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+COPY_CHUNK_SIZE = 1024 * 1024
+PCM_FORMATS = (1, 0xFFFE)  # WAVE_FORMAT_PCM, WAVE_FORMAT_EXTENSIBLE
+MAX_DATA_SIZE = 0xFFFFFFFF - 36
+
+_LINE_FILENAME_PATTERN = re.compile(r'audio_(\d+)_(.+)\.wav$')
+
+
+@dataclass
+class WavInfo:
+    """Format and data location of a PCM WAV file"""
+
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def block_align(self) -> int:
+        return self.channels * self.bits_per_sample // 8
+
+    @property
+    def byte_rate(self) -> int:
+        return self.sample_rate * self.block_align
+
+    @property
+    def duration(self) -> float:
+        return self.data_size / self.byte_rate
+
+    def same_format(self, other: 'WavInfo') -> bool:
+        return (
+            self.channels == other.channels
+            and self.sample_rate == other.sample_rate
+            and self.bits_per_sample == other.bits_per_sample
+        )
+
+
+def read_wav_info(path: str) -> WavInfo:
+    """
+    Read a WAV header without touching the sample data
+    Args:
+        path: Path to WAV file
+    Returns: WavInfo for the file's fmt and data chunks
+    """
+    with open(path, 'rb') as f:
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError(f"Not a WAV file: {path}")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"WAV file has no data chunk: {path}")
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+
+            if chunk_id == b'fmt ':
+                fmt = struct.unpack('<HHIIHH', f.read(16))
+                f.seek(chunk_size - 16 + (chunk_size & 1), os.SEEK_CUR)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"WAV data chunk before fmt chunk: {path}")
+                format_tag, channels, sample_rate, _, _, bits = fmt
+                if format_tag not in PCM_FORMATS:
+                    raise ValueError(f"Unsupported WAV encoding {format_tag:#x}: {path}")
+                # Clamp to the real file size for streams written with a bogus length
+                data_offset = f.tell()
+                data_size = min(chunk_size, os.fstat(f.fileno()).st_size - data_offset)
+                return WavInfo(channels, sample_rate, bits, data_offset, data_size)
+            else:
+                f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+
+def _wav_header(info: WavInfo, data_size: int) -> bytes:
+    """Canonical 44-byte PCM header"""
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, info.channels, info.sample_rate,
+        info.byte_rate, info.block_align, info.bits_per_sample,
+        b'data', data_size
+    )
+
+
+def _copy_data(src, dst, info: WavInfo):
+    """Copy a clip's sample data, memory-mapped where possible"""
+    try:
+        mapped = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        mapped = None
+
+    if mapped is not None:
+        with mapped:
+            view = memoryview(mapped)
+            end = info.data_offset + info.data_size
+            for start in range(info.data_offset, end, COPY_CHUNK_SIZE):
+                dst.write(view[start:min(start + COPY_CHUNK_SIZE, end)])
+            view.release()
+        return
+
+    src.seek(info.data_offset)
+    remaining = info.data_size
+    while remaining:
+        chunk = src.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+
+def parse_line_filename(path: str) -> tuple[int | None, str | None]:
+    """Extract (idx, speaker) from an audio_{idx}_{speaker}.wav filename"""
+    match = _LINE_FILENAME_PATTERN.search(Path(path).name)
+    if not match:
+        return None, None
+    return int(match.group(1)), match.group(2)
+
+
+def concatenate_wavs(
+    audio_files: list[str],
+    output_file: str,
+    speaker_gap: float = 0.0,
+    line_gap: float = 0.0
+) -> tuple[str, list[dict]]:
+    """
+    Concatenate PCM WAV clips by copying their sample data
+    Args:
+        audio_files: WAV paths in playback order; all must share one format
+        output_file: Output WAV path
+        speaker_gap: Seconds of silence inserted when the speaker changes
+        line_gap: Seconds of silence inserted between lines of the same speaker
+    Returns: (output path, list of {file, index, speaker, start, end} offsets in seconds)
+    """
+    infos = [read_wav_info(path) for path in audio_files]
+    if not infos:
+        raise ValueError("No audio files to concatenate")
+
+    first = infos[0]
+    for path, info in zip(audio_files, infos):
+        if not info.same_format(first):
+            raise ValueError(
+                f"WAV format mismatch in {path}: "
+                f"{info.channels}ch/{info.sample_rate}Hz/{info.bits_per_sample}bit, expected "
+                f"{first.channels}ch/{first.sample_rate}Hz/{first.bits_per_sample}bit"
+            )
+
+    def gap_bytes(seconds: float) -> int:
+        return int(seconds * first.sample_rate) * first.block_align
+
+    timings = []
+    data_size = 0
+    previous_speaker = None
+
+    with open(output_file, 'wb') as out:
+        # Sizes are unknown until the end; the header is rewritten once
+        out.write(_wav_header(first, 0))
+
+        for path, info in zip(audio_files, infos):
+            index, speaker = parse_line_filename(path)
+            if timings:
+                silence = gap_bytes(speaker_gap if speaker != previous_speaker else line_gap)
+                # Seeking past the written data leaves zero-filled samples
+                # without allocating a silence buffer
+                out.seek(silence, os.SEEK_CUR)
+                data_size += silence
+
+            start = data_size / first.byte_rate
+            with open(path, 'rb') as src:
+                _copy_data(src, out, info)
+            data_size += info.data_size
+
+            timings.append({
+                'file': path,
+                'index': index,
+                'speaker': speaker,
+                'start': start,
+                'end': data_size / first.byte_rate
+            })
+            previous_speaker = speaker
+
+        if data_size > MAX_DATA_SIZE:
+            raise ValueError("Concatenated audio exceeds the 4 GB WAV limit")
+
+        out.truncate(44 + data_size)
+        out.seek(0)
+        out.write(_wav_header(first, data_size))
+
+    return output_file, timings
@@ -0,0 +1,266 @@
+"""
+Run Workspace Module
+Gives each pipeline run an isolated working directory with disk quotas
+and a retention policy for finished runs
+"""
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from config import config
+
+STATUS_FILE = ".status"
+# "host:pid" of the process running the workspace
+OWNER_FILE = ".owner"
+
+
+class WorkspaceQuotaError(RuntimeError):
+    """Raised when a run or the workspace root exceeds its disk quota"""
+
+
+def directory_size(path: Path) -> int:
+    """Total size in bytes of the files under path"""
+    total = 0
+    for file in path.rglob('*'):
+        try:
+            if file.is_file():
+                total += file.stat().st_size
+        except FileNotFoundError:
+            # Removed by a concurrent cleanup
+            continue
+    return total
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, owned by another user
+        return True
+    return True
+
+
+def new_run_id() -> str:
+    """Sortable, collision-free run identifier"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class Workspace:
+    """
+    Isolated directory for one pipeline run
+    Plain data so it can be handed to worker processes
+    """
+
+    run_id: str
+    root: Path
+    quota_bytes: int = 0
+    global_quota_bytes: int = 0
+
+    def path(self, *parts: str) -> Path:
+        """Path inside the workspace; parent directories are created"""
+        path = self.root.joinpath(*parts)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def directory(self, *parts: str) -> Path:
+        """Directory inside the workspace, created if needed"""
+        path = self.root.joinpath(*parts)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    @property
+    def audio_dir(self) -> Path:
+        return self.directory("audio")
+
+    @property
+    def audio_file(self) -> Path:
+        return self.path("final_audio.wav")
+
+    @property
+    def video_file(self) -> Path:
+        return self.path("final_video.mp4")
+
+    @property
+    def thumbnail_file(self) -> Path:
+        return self.path("thumbnail.jpg")
+
+    def usage(self) -> int:
+        """Bytes currently used by this run"""
+        return directory_size(self.root)
+
+    def check_quota(self):
+        """Raise WorkspaceQuotaError if this run or all runs together are over quota"""
+        if self.quota_bytes:
+            used = self.usage()
+            if used > self.quota_bytes:
+                raise WorkspaceQuotaError(
+                    f"Run {self.run_id} uses {used / 2**20:.1f} MB "
+                    f"(quota {self.quota_bytes / 2**20:.1f} MB)"
+                )
+        if self.global_quota_bytes:
+            used = directory_size(self.root.parent)
+            if used > self.global_quota_bytes:
+                raise WorkspaceQuotaError(
+                    f"Workspaces use {used / 2**20:.1f} MB "
+                    f"(quota {self.global_quota_bytes / 2**20:.1f} MB)"
+                )
+
+    @property
+    def status(self) -> str | None:
+        """'created', 'running', 'success', 'failed', or None if unknown"""
+        try:
+            return (self.root / STATUS_FILE).read_text().strip()
+        except FileNotFoundError:
+            return None
+
+    def set_status(self, status: str):
+        (self.root / STATUS_FILE).write_text(status)
+        if status == 'running':
+            (self.root / OWNER_FILE).write_text(f"{socket.gethostname()}:{os.getpid()}")
+
+    def heartbeat(self):
+        """Mark the run as still alive (retention ages runs from their last heartbeat)"""
+        try:
+            os.utime(self.root / STATUS_FILE)
+        except FileNotFoundError:
+            pass
+
+    def owner_alive(self) -> bool | None:
+        """Whether the owning process is still running; None if it cannot be told from this host"""
+        try:
+            host, pid = (self.root / OWNER_FILE).read_text().strip().rsplit(':', 1)
+        except (FileNotFoundError, ValueError):
+            return None
+        if host != socket.gethostname():
+            return None
+        return _process_alive(int(pid))
+
+
+class WorkspaceManager:
+    """Creates run workspaces under one root and prunes finished ones"""
+
+    def __init__(
+        self,
+        root: str = None,
+        run_quota_bytes: int = None,
+        global_quota_bytes: int = None,
+        keep_successful: int = None,
+        keep_failed: int = None,
+        max_age: float = None
+    ):
+        """
+        Args:
+            root: Directory holding one subdirectory per run
+            run_quota_bytes: Disk quota per run (0 = unlimited)
+            global_quota_bytes: Disk quota for all runs together (0 = unlimited)
+            keep_successful: Finished successful runs kept for inspection
+            keep_failed: Failed runs kept for debugging
+            max_age: Seconds after which any finished or abandoned run is removed
+        """
+        self.root = Path(root or config.WORKSPACE_ROOT)
+        self.run_quota_bytes = (
+            run_quota_bytes if run_quota_bytes is not None
+            else config.WORKSPACE_RUN_QUOTA_MB * 1024 * 1024
+        )
+        self.global_quota_bytes = (
+            global_quota_bytes if global_quota_bytes is not None
+            else config.WORKSPACE_GLOBAL_QUOTA_MB * 1024 * 1024
+        )
+        self.keep_successful = keep_successful if keep_successful is not None else config.WORKSPACE_KEEP_SUCCESSFUL
+        self.keep_failed = keep_failed if keep_failed is not None else config.WORKSPACE_KEEP_FAILED
+        self.max_age = max_age if max_age is not None else config.WORKSPACE_RETENTION_HOURS * 3600
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def create(self, run_id: str = None) -> Workspace:
+        """
+        Open the workspace for run_id, creating it (and a new run_id) if needed
+        Old runs are pruned first so a full disk frees up before refusing work.
+        The workspace stays 'created' (pruned by age alone) until its run starts
+        """
+        with self._lock:
+            self.apply_retention()
+            workspace = self._workspace(run_id or new_run_id())
+            workspace.root.mkdir(parents=True, exist_ok=True)
+            workspace.set_status('created')
+
+        workspace.check_quota()
+        return workspace
+
+    def get(self, run_id: str) -> Workspace | None:
+        """Existing workspace for run_id, if any"""
+        workspace = self._workspace(run_id)
+        return workspace if workspace.root.is_dir() else None
+
+    def _workspace(self, run_id: str) -> Workspace:
+        return Workspace(
+            run_id=run_id,
+            root=self.root / run_id,
+            quota_bytes=self.run_quota_bytes,
+            global_quota_bytes=self.global_quota_bytes
+        )
+
+    def release(self, workspace: Workspace, success: bool):
+        """Mark a run finished and apply the retention policy"""
+        with self._lock:
+            if workspace.root.is_dir():
+                workspace.set_status('success' if success else 'failed')
+            self.apply_retention()
+
+    def apply_retention(self):
+        """
+        Remove finished runs beyond the keep counts and any run older than max_age
+        A running workspace is never removed while its owning process is alive;
+        otherwise it is treated as abandoned once its last heartbeat (stage
+        start) is older than max_age. A 'created' workspace whose run never
+        started is removed by age alone
+        """
+        now = time.time()
+        finished = {'success': [], 'failed': []}
+        for path in self.root.iterdir():
+            if not path.is_dir():
+                continue
+            workspace = self._workspace(path.name)
+            try:
+                mtime = (path / STATUS_FILE).stat().st_mtime
+            except FileNotFoundError:
+                mtime = path.stat().st_mtime
+
+            status = workspace.status
+            if status == 'running' and workspace.owner_alive():
+                continue
+            if self.max_age and now - mtime > self.max_age:
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            if status in finished:
+                finished[status].append((mtime, path))
+
+        for status, keep in (('success', self.keep_successful), ('failed', self.keep_failed)):
+            runs = sorted(finished[status], reverse=True)
+            for _, path in runs[keep:]:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def usage(self) -> int:
+        """Bytes used by all workspaces"""
+        return directory_size(self.root)
+
+
+_workspace_manager = None
+_workspace_manager_lock = threading.Lock()
+
+
+def get_workspace_manager() -> WorkspaceManager:
+    """Get the process-wide workspace manager"""
+    global _workspace_manager
+    with _workspace_manager_lock:
+        if _workspace_manager is None:
+            _workspace_manager = WorkspaceManager()
+        return _workspace_manager
@@ -0,0 +1,182 @@
+"""
+YouTube Client Module
+Process-wide YouTube Data API client built from the static discovery
+document bundled with google-api-python-client, with proactive OAuth
+token refresh
+"""
+import threading
+import time
+from datetime import datetime, timezone
+
+import google_auth_httplib2
+import httplib2
+from google.auth import credentials as google_credentials
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from config import config
+from .youtube_metadata import VideoInfoCache
+
+
+def _get_credentials() -> Credentials:
+    """Get OAuth2 credentials"""
+    # For production, use refresh token
+    return Credentials(
+        token=None,
+        refresh_token=config.YOUTUBE_REFRESH_TOKEN,
+        token_uri='https://oauth2.googleapis.com/token',
+        client_id=config.YOUTUBE_CLIENT_ID,
+        client_secret=config.YOUTUBE_CLIENT_SECRET
+    )
+
+
+# Backoff between failed background refreshes
+REFRESH_RETRY_INITIAL = 30
+REFRESH_RETRY_MAX = 30 * 60
+
+
+class _LockedCredentials(google_credentials.Credentials):
+    """
+    Credentials proxy whose refreshes hold the client's token lock, so
+    AuthorizedHttp's in-request refresh cannot race the background one
+    A real google.auth Credentials subclass, because googleapiclient (e.g.
+    BatchHttpRequest.execute) type-checks the credentials it finds on the Http
+    """
+
+    def __init__(self, credentials: Credentials, lock: threading.RLock):
+        # No super().__init__(): token, expiry and the rest live on the wrapped credentials
+        self._credentials = credentials
+        self._lock = lock
+
+    def __getattr__(self, name):
+        return getattr(self._credentials, name)
+
+    @property
+    def token(self):
+        return self._credentials.token
+
+    @property
+    def expiry(self):
+        return self._credentials.expiry
+
+    @property
+    def expired(self):
+        return self._credentials.expired
+
+    @property
+    def valid(self):
+        return self._credentials.valid
+
+    def apply(self, headers, token=None):
+        self._credentials.apply(headers, token=token)
+
+    def before_request(self, request, method, url, headers):
+        with self._lock:
+            self._credentials.before_request(request, method, url, headers)
+
+    def refresh(self, request):
+        with self._lock:
+            self._credentials.refresh(request)
+
+
+class YouTubeClient:
+    """
+    Discovery-parsed service resource shared by every uploader in the process
+    The resource is thread-safe to share; HTTP connections are not, so each
+    thread executes requests through its own authorised Http
+    """
+
+    def __init__(self, credentials: Credentials = None, refresh_margin: float = None):
+        """
+        Args:
+            credentials: OAuth2 credentials (defaults to the YOUTUBE_* settings)
+            refresh_margin: Seconds before expiry at which the token is refreshed
+        """
+        self.credentials = credentials or _get_credentials()
+        self.refresh_margin = (
+            refresh_margin if refresh_margin is not None else config.YOUTUBE_TOKEN_REFRESH_MARGIN
+        )
+        # Static discovery: no network fetch, parsed once per process
+        self.resource = build(
+            'youtube',
+            'v3',
+            credentials=self.credentials,
+            static_discovery=True,
+            cache_discovery=False
+        )
+        self.video_cache = VideoInfoCache(ttl=config.YOUTUBE_METADATA_CACHE_TTL)
+        self._token_lock = threading.RLock()
+        self._local = threading.local()
+        self._refresher = threading.Thread(
+            target=self._refresh_loop,
+            name='youtube-token-refresh',
+            daemon=True
+        )
+        self._refresher.start()
+
+    def http(self) -> google_auth_httplib2.AuthorizedHttp:
+        """Authorised Http for the calling thread"""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(
+                _LockedCredentials(self.credentials, self._token_lock),
+                http=httplib2.Http(timeout=60)
+            )
+            self._local.http = http
+        return http
+
+    def authorize(self) -> dict:
+        """Bearer header; only refreshes inline if the background refresh fell behind"""
+        with self._token_lock:
+            if not self.credentials.valid:
+                self.credentials.refresh(Request())
+            return {'Authorization': f"Bearer {self.credentials.token}"}
+
+    def _seconds_until_refresh(self) -> float:
+        expiry = self.credentials.expiry
+        if not self.credentials.token or expiry is None:
+            return 0.0
+        # google-auth keeps expiry as naive UTC
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return (expiry - now).total_seconds() - self.refresh_margin
+
+    def _refresh_loop(self):
+        """
+        Keep the access token valid so requests never wait on a refresh
+        Stops on a non-retryable RefreshError (missing or revoked credentials);
+        other failures are retried with exponential backoff
+        """
+        retry_delay = REFRESH_RETRY_INITIAL
+        while True:
+            delay = self._seconds_until_refresh()
+            if delay > 0:
+                time.sleep(delay)
+                continue
+            try:
+                with self._token_lock:
+                    if self._seconds_until_refresh() <= 0:
+                        self.credentials.refresh(Request())
+                retry_delay = REFRESH_RETRY_INITIAL
+            except Exception as e:
+                if isinstance(e, RefreshError) and not getattr(e, 'retryable', False):
+                    # Requests will surface the error via authorize(); retrying cannot fix it
+                    print(f"⚠️  YouTube token refresh failed, background refresh stopped: {e}")
+                    return
+                print(f"⚠️  YouTube token refresh failed, retrying in {retry_delay}s: {e}")
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, REFRESH_RETRY_MAX)
+
+
+_youtube_client = None
+_youtube_client_lock = threading.Lock()
+
+
+def get_youtube_client() -> YouTubeClient:
+    """Get the process-wide YouTube client"""
+    global _youtube_client
+    with _youtube_client_lock:
+        if _youtube_client is None:
+            _youtube_client = YouTubeClient()
+        return _youtube_client
@@ -0,0 +1,117 @@
+"""
+YouTube Metadata Cache
+TTL cache of videos().list items with ETag revalidation of whole batches
+"""
+import threading
+import time
+from dataclasses import dataclass
+
+# videos().list accepts at most 50 IDs per call
+MAX_IDS_PER_LIST = 50
+
+
+@dataclass
+class CachedVideo:
+    """One video resource plus the list response it came from"""
+
+    item: dict
+    fetched_at: float
+    batch: tuple[str, ...]
+    batch_etag: str | None
+
+
+class VideoInfoCache:
+    """In-memory video resources keyed by ID"""
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self._videos: dict[str, CachedVideo] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.fetched = 0
+
+    def get(self, video_id: str) -> CachedVideo | None:
+        with self._lock:
+            return self._videos.get(video_id)
+
+    def is_fresh(self, entry: CachedVideo) -> bool:
+        return time.time() - entry.fetched_at < self.ttl
+
+    def store_batch(self, batch: tuple[str, ...], etag: str | None, items: list[dict]):
+        """Cache every item of one list response"""
+        now = time.time()
+        with self._lock:
+            for item in items:
+                self._videos[item['id']] = CachedVideo(item, now, batch, etag)
+            self.fetched += len(items)
+
+    def touch_batch(self, batch: tuple[str, ...]):
+        """A 304 for this batch: its items are current again"""
+        now = time.time()
+        with self._lock:
+            for video_id in batch:
+                entry = self._videos.get(video_id)
+                if entry:
+                    entry.fetched_at = now
+            self.revalidated += len(batch)
+
+    def put(self, item: dict):
+        """Replace one item, e.g. with the resource returned by an update"""
+        with self._lock:
+            previous = self._videos.get(item['id'])
+            if previous:
+                # Keep statistics/status parts the update response does not include
+                item = {**previous.item, **item}
+            # Its batch ETag is stale now, so the next refresh is unconditional
+            self._videos[item['id']] = CachedVideo(item, time.time(), (item['id'],), None)
+
+    def count_hits(self, count: int):
+        with self._lock:
+            self.hits += count
+
+    def invalidate(self, video_id: str = None):
+        """Drop one video, or everything"""
+        with self._lock:
+            if video_id:
+                self._videos.pop(video_id, None)
+            else:
+                self._videos.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._videos),
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'fetched': self.fetched
+            }
+
+
+def plan_batches(video_ids: list[str], cache: VideoInfoCache) -> tuple[list[str], list[tuple[str, ...]], list[str]]:
+    """
+    Split requested IDs by what the cache can do for them
+    Returns: (fresh IDs, stale batches that can be revalidated with their
+        ETag as a whole, IDs that need an unconditional fetch)
+    """
+    fresh = []
+    stale = {}
+    missing = []
+    for video_id in dict.fromkeys(video_ids):
+        entry = cache.get(video_id)
+        if entry is None:
+            missing.append(video_id)
+        elif cache.is_fresh(entry):
+            fresh.append(video_id)
+        else:
+            stale.setdefault(entry.batch, []).append(video_id)
+
+    revalidate = []
+    for batch, ids in stale.items():
+        entry = cache.get(ids[0])
+        # Conditional requests only work for the exact batch the ETag belongs to
+        if entry and entry.batch_etag and len(ids) == len(batch):
+            revalidate.append(batch)
+        else:
+            missing.extend(ids)
+    return fresh, revalidate, missing
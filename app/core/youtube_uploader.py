@@ -2,31 +2,25 @@
 YouTube Upload Module
 Uploads videos to YouTube using YouTube Data API v3
 """
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
 from config import config
+from typing import Callable
+from .resumable_upload import ResumableUploader, UploadSessionStore
+from .youtube_client import YouTubeClient, get_youtube_client
+from .youtube_metadata import MAX_IDS_PER_LIST, VideoInfoCache, plan_batches
 import os
 
 
 class YouTubeUploader:
     """YouTube video uploader"""
 
-    def __init__(self):
-        self.credentials = self._get_credentials()
-        self.youtube = build('youtube', 'v3', credentials=self.credentials)
-
-    def _get_credentials(self) -> Credentials:
-        """Get OAuth2 credentials"""
-        # For production, use refresh token
-        credentials = Credentials(
-            token=None,
-            refresh_token=config.YOUTUBE_REFRESH_TOKEN,
-            token_uri='https://oauth2.googleapis.com/token',
-            client_id=config.YOUTUBE_CLIENT_ID,
-            client_secret=config.YOUTUBE_CLIENT_SECRET
-        )
-        return credentials
+    def __init__(self, video_cache: VideoInfoCache = None, client: YouTubeClient = None):
+        # Discovery parsing and token refresh happen once per process, not per upload
+        self.client = client or get_youtube_client()
+        self.credentials = self.client.credentials
+        self.youtube = self.client.resource
+        self.video_cache = video_cache or self.client.video_cache
 
     def upload_video(
         self,
@@ -36,7 +30,9 @@ class YouTubeUploader:
         tags: list[str] = None,
         category_id: str = '25',  # News & Politics
         privacy_status: str = 'public',
-        thumbnail_file: str = None
+        thumbnail_file: str = None,
+        session_file: str = None,
+        encoder_finished: Callable[[], bool] = None
     ) -> dict:
         """
         Upload video to YouTube
@@ -48,6 +44,11 @@ class YouTubeUploader:
             category_id: YouTube category ID
             privacy_status: 'public', 'private', or 'unlisted'
             thumbnail_file: Path to thumbnail image (optional)
+            session_file: Where the upload session persists; an interrupted
+                upload of the same file resumes from the server's offset
+            encoder_finished: Set while video_file is still being encoded as
+                fragmented MP4; fragments are uploaded as they are written
+                and the upload is finalised once this returns True
         Returns: dict with video info including video_id and url
         """
         print(f"📤 Uploading video to YouTube: {title}")
@@ -67,29 +68,21 @@ class YouTubeUploader:
         }
 
         # Create media file upload
-        if not os.path.exists(video_file):
+        if encoder_finished is None and not os.path.exists(video_file):
             raise FileNotFoundError(f"Video file not found: {video_file}")
 
-        media = MediaFileUpload(
-            video_file,
-            chunksize=1024*1024,  # 1MB chunks
-            resumable=True,
-            mimetype='video/*'
-        )
-
-        # Execute upload
-        request = self.youtube.videos().insert(
-            part='snippet,status',
-            body=body,
-            media_body=media
+        # Chunk size follows measured throughput instead of a fixed 1MB
+        uploader = ResumableUploader(
+            self.client.authorize,
+            f"{config.YOUTUBE_UPLOAD_URL}/upload/youtube/v3/videos"
+            "?uploadType=resumable&part=snippet,status",
+            session_store=UploadSessionStore(session_file) if session_file else None,
+            on_progress=self._print_progress
         )
-
-        response = None
-        while response is None:
-            status, response = request.next_chunk()
-            if status:
-                progress = int(status.progress() * 100)
-                print(f"⏳ Upload progress: {progress}%")
+        if encoder_finished:
+            response = uploader.upload_growing(video_file, body, encoder_finished)
+        else:
+            response = uploader.upload(video_file, body)
 
         video_id = response['id']
         video_url = f"https://www.youtube.com/watch?v={video_id}"
@@ -109,6 +102,14 @@ class YouTubeUploader:
             'status': 'success'
         }
 
+    @staticmethod
+    def _print_progress(uploaded: int, total: int):
+        if total:
+            print(f"⏳ Upload progress: {int(100 * uploaded / total)}%")
+        else:
+            # Size unknown while the encoder is still writing
+            print(f"⏳ Uploaded {uploaded / 2**20:.0f} MB")
+
     def _upload_thumbnail(self, video_id: str, thumbnail_file: str):
         """Upload custom thumbnail"""
         print(f"🖼️  Uploading thumbnail...")
@@ -118,23 +119,63 @@ class YouTubeUploader:
         self.youtube.thumbnails().set(
             videoId=video_id,
             media_body=media
-        ).execute()
+        ).execute(http=self.client.http())
 
         print(f"✅ Thumbnail uploaded")
 
     def get_video_info(self, video_id: str) -> dict:
         """Get video information"""
+        videos = self.get_videos_info([video_id])
+        if video_id not in videos:
+            raise ValueError(f"Video not found: {video_id}")
+        return videos[video_id]
+
+    def get_videos_info(self, video_ids: list[str]) -> dict[str, dict]:
+        """
+        Get information for many videos
+        Fresh cache entries are served locally, stale batches are revalidated
+        with their ETag and the rest is fetched 50 IDs per videos().list call
+        Args:
+            video_ids: Video IDs
+        Returns: dict of video ID to video resource (missing videos are omitted)
+        """
+        fresh, revalidate, missing = plan_batches(video_ids, self.video_cache)
+        self.video_cache.count_hits(len(fresh))
+
+        for batch in revalidate:
+            self._list_videos(batch, etag=self.video_cache.get(batch[0]).batch_etag)
+        for start in range(0, len(missing), MAX_IDS_PER_LIST):
+            self._list_videos(tuple(missing[start:start + MAX_IDS_PER_LIST]))
+
+        videos = {}
+        for video_id in video_ids:
+            entry = self.video_cache.get(video_id)
+            if entry:
+                videos[video_id] = entry.item
+        return videos
+
+    def _list_videos(self, batch: tuple[str, ...], etag: str = None):
+        """One videos().list call for up to 50 IDs, conditional when etag is given"""
         request = self.youtube.videos().list(
             part='snippet,statistics,status',
-            id=video_id
+            id=','.join(batch),
+            maxResults=MAX_IDS_PER_LIST
         )
-
-        response = request.execute()
-
-        if not response['items']:
-            raise ValueError(f"Video not found: {video_id}")
-
-        return response['items'][0]
+        if etag:
+            request.headers['If-None-Match'] = etag
+
+        try:
+            response = request.execute(http=self.client.http())
+        except HttpError as e:
+            if etag and e.resp.status == 304:
+                self.video_cache.touch_batch(batch)
+                return
+            raise
+
+        # Deleted videos are absent from the response, so drop them first
+        for video_id in batch:
+            self.video_cache.invalidate(video_id)
+        self.video_cache.store_batch(batch, response.get('etag'), response['items'])
 
     def update_video(
         self,
@@ -144,28 +185,67 @@ class YouTubeUploader:
         tags: list[str] = None
     ) -> dict:
         """Update video metadata"""
-        # Get current video info
-        current = self.get_video_info(video_id)
-
-        # Update fields
-        snippet = current['snippet']
-        if title:
-            snippet['title'] = title
-        if description:
-            snippet['description'] = description
-        if tags:
-            snippet['tags'] = tags
-
-        # Execute update
-        request = self.youtube.videos().update(
-            part='snippet',
-            body={
-                'id': video_id,
-                'snippet': snippet
-            }
-        )
-
-        response = request.execute()
-        print(f"✅ Video updated: {video_id}")
+        changes = {'title': title, 'description': description, 'tags': tags}
+        responses = self.update_videos({video_id: changes})
+        return responses.get(video_id) or self.get_video_info(video_id)
 
-        return response
+    def update_videos(self, updates: dict[str, dict]) -> dict[str, dict]:
+        """
+        Update metadata for many videos
+        Current snippets are read in batches, and only videos whose snippet
+        actually changes are sent, grouped into batch HTTP requests
+        Args:
+            updates: dict of video ID to {title, description, tags}; None or
+                missing fields are left unchanged, while '' or [] clear the field
+        Returns: dict of video ID to updated resource for the videos that changed
+        """
+        current = self.get_videos_info(list(updates))
+        missing = [video_id for video_id in updates if video_id not in current]
+        if missing:
+            raise ValueError(f"Video not found: {', '.join(missing)}")
+
+        changed = {}
+        for video_id, fields in updates.items():
+            snippet = dict(current[video_id]['snippet'])
+            updated = False
+            for name, empty in (('title', ''), ('description', ''), ('tags', [])):
+                value = fields.get(name)
+                # A snippet omits tags and an empty description instead of sending them empty
+                if value is not None and value != snippet.get(name, empty):
+                    snippet[name] = value
+                    updated = True
+            if updated:
+                changed[video_id] = snippet
+
+        skipped = len(updates) - len(changed)
+        if skipped:
+            print(f"⏭️  {skipped} video(s) already up to date")
+
+        responses = {}
+        errors = {}
+
+        def on_response(video_id, response, exception):
+            if exception is not None:
+                errors[video_id] = exception
+                return
+            responses[video_id] = response
+            self.video_cache.put(response)
+            print(f"✅ Video updated: {video_id}")
+
+        ids = list(changed)
+        for start in range(0, len(ids), MAX_IDS_PER_LIST):
+            batch = self.youtube.new_batch_http_request(callback=on_response)
+            for video_id in ids[start:start + MAX_IDS_PER_LIST]:
+                batch.add(
+                    self.youtube.videos().update(
+                        part='snippet',
+                        body={'id': video_id, 'snippet': changed[video_id]}
+                    ),
+                    request_id=video_id
+                )
+            batch.execute(http=self.client.http())
+
+        if errors:
+            video_id, error = next(iter(errors.items()))
+            raise RuntimeError(f"Failed to update {len(errors)} video(s), first {video_id}: {error}") from error
+        return responses
@@ -0,0 +1,145 @@
+"""
+Stage Checkpoints
+Durable per-stage results so a failed run can resume from the last
+completed stage
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from app.core.workspace import Workspace
+
+
+class NotCheckpointable(TypeError):
+    """Raised for stage inputs or outputs that cannot be persisted"""
+
+
+def _fingerprint(value):
+    """
+    JSON-safe fingerprint of a stage input
+    Paths to existing files include size and mtime, so rewriting an
+    upstream artifact invalidates everything that consumed it
+    """
+    if isinstance(value, Workspace):
+        return {'workspace': value.run_id}
+    if isinstance(value, Path):
+        value = str(value)
+    if isinstance(value, str):
+        if value and os.path.isfile(value):
+            stat = os.stat(value)
+            return {'file': value, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        return value
+    if isinstance(value, dict):
+        return {str(k): _fingerprint(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint(v) for v in value]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    raise NotCheckpointable(f"Cannot fingerprint {type(value).__name__}")
+
+
+def _artifacts(value, found: dict):
+    """Collect {path: {size, mtime_ns}} for every file path in value"""
+    if isinstance(value, Path):
+        value = str(value)
+    if isinstance(value, str):
+        if value and os.path.isfile(value):
+            stat = os.stat(value)
+            found[value] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    elif isinstance(value, dict):
+        for v in value.values():
+            _artifacts(v, found)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _artifacts(v, found)
+    return found
+
+
+class CheckpointStore:
+    """One JSON checkpoint per stage inside a run workspace"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def inputs_hash(stage: str, inputs: dict) -> str:
+        """
+        Hash of a stage's name and input values
+        Raises NotCheckpointable for inputs that only exist in memory
+        """
+        payload = json.dumps(
+            {'stage': stage, 'inputs': _fingerprint(inputs)},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, stage: str) -> Path:
+        return self.directory / f"{stage}.json"
+
+    def load(self, stage: str, inputs_hash: str, outputs: list[str]) -> dict | None:
+        """
+        Outputs of a completed stage, or None if the checkpoint is missing,
+        was made from different inputs, lacks an output or its artifacts changed
+        """
+        try:
+            checkpoint = json.loads(self._path(stage).read_text(encoding='utf-8'))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        if checkpoint.get('inputs_hash') != inputs_hash:
+            return None
+        if any(name not in checkpoint['outputs'] for name in outputs):
+            return None
+        for path, expected in checkpoint.get('artifacts', {}).items():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return None
+            if stat.st_size != expected['size'] or stat.st_mtime_ns != expected['mtime_ns']:
+                return None
+
+        return {name: checkpoint['outputs'][name] for name in outputs}
+
+    def save(self, stage: str, inputs_hash: str, outputs: dict):
+        """
+        Atomically record a completed stage
+        Outputs that only exist in memory (e.g. futures) are left out
+        """
+        persisted = {}
+        for name, value in outputs.items():
+            try:
+                json.dumps(value)
+            except TypeError:
+                continue
+            persisted[name] = value
+
+        checkpoint = {
+            'stage': stage,
+            'inputs_hash': inputs_hash,
+            'outputs': persisted,
+            'artifacts': _artifacts(persisted, {}),
+            'created_at': time.time()
+        }
+
+        path = self._path(stage)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def invalidate(self, stage: str = None):
+        """Drop one stage's checkpoint, or all of them"""
+        paths = [self._path(stage)] if stage else list(self.directory.glob('*.json'))
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def completed(self) -> list[str]:
+        """Stages with a checkpoint on disk"""
+        return sorted(path.stem for path in self.directory.glob('*.json'))
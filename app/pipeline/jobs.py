@@ -0,0 +1,206 @@
+"""
+Pipeline Job Queue
+Runs VideoPipeline jobs on a bounded worker pool off the web event loop
+and keeps a per-run record of stage, progress and timings
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+from config import config
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when too many jobs are already queued or running"""
+
+
+@dataclass
+class Job:
+    """State of a single pipeline run"""
+
+    job_id: str
+    user_id: str = None
+    status: str = 'queued'  # queued, running, success, failed
+    stage: str = None
+    progress: int = 0
+    error: str = None
+    result: dict = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float = None
+    finished_at: float = None
+    timings: dict = field(default_factory=dict)  # stage -> seconds
+    stage_started_at: dict = field(default_factory=dict)  # stage -> start time, while running
+
+    def to_dict(self) -> dict:
+        """Serialisable snapshot of the job"""
+        return {
+            'job_id': self.job_id,
+            'user_id': self.user_id,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'timings': dict(self.timings)
+        }
+
+
+class JobStore:
+    """Thread-safe in-memory store of job records"""
+
+    def __init__(self, max_jobs: int = 200):
+        self.max_jobs = max_jobs
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def create(self, user_id: str = None, max_active: int = None) -> Job:
+        """
+        Create and register a new queued job
+        Args:
+            user_id: LINE user ID that requested the run
+            max_active: Refuse the job if this many are already queued or running
+        Raises: JobQueueFullError when max_active is reached
+        """
+        job = Job(job_id=uuid.uuid4().hex[:8], user_id=user_id)
+        with self._lock:
+            # Checked under the same lock as the insert so concurrent submits cannot overshoot
+            if max_active is not None and self._active_count() >= max_active:
+                raise JobQueueFullError("Too many pipeline jobs are queued")
+            self._jobs[job.job_id] = job
+            self._evict()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Get a job by ID"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest_for_user(self, user_id: str) -> Job | None:
+        """Get the most recently created job for a user"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.user_id == user_id]
+        return max(jobs, key=lambda job: job.created_at) if jobs else None
+
+    def active_count(self) -> int:
+        """Number of jobs that are queued or running"""
+        with self._lock:
+            return self._active_count()
+
+    def _active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status in ('queued', 'running'))
+
+    def start(self, job_id: str):
+        """Mark a job as running"""
+        with self._lock:
+            job = self._jobs[job_id]
+            job.status = 'running'
+            job.started_at = time.time()
+
+    def update_stage(self, job_id: str, stage: str, progress: int):
+        """Record that a job started a stage (stages may overlap)"""
+        with self._lock:
+            job = self._jobs[job_id]
+            job.stage = stage
+            job.progress = progress
+            job.stage_started_at[stage] = time.time()
+
+    def finish_stage(self, job_id: str, stage: str, seconds: float):
+        """Record a completed or failed stage's duration as measured by the scheduler"""
+        with self._lock:
+            job = self._jobs[job_id]
+            job.stage_started_at.pop(stage, None)
+            job.timings[stage] = seconds
+
+    def finish(self, job_id: str, result: dict = None, error: str = None):
+        """Mark a job as finished"""
+        with self._lock:
+            job = self._jobs[job_id]
+            job.finished_at = time.time()
+            # Stages still running when the job ended (e.g. alongside a failed one)
+            for stage, started_at in job.stage_started_at.items():
+                job.timings[stage] = round(job.finished_at - started_at, 3)
+            job.stage_started_at.clear()
+            job.result = result
+            job.error = error
+            job.status = 'failed' if error else 'success'
+            if not error:
+                job.progress = 100
+
+    def _evict(self):
+        """Drop the oldest finished jobs once the store is full"""
+        if len(self._jobs) <= self.max_jobs:
+            return
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished_at is not None),
+            key=lambda job: job.finished_at
+        )
+        for job in finished[:len(self._jobs) - self.max_jobs]:
+            del self._jobs[job.job_id]
+
+
+class JobQueue:
+    """Bounded worker pool that executes pipeline jobs"""
+
+    def __init__(self, max_workers: int = None, max_pending: int = None, store: JobStore = None):
+        self.max_workers = max_workers or config.PIPELINE_WORKERS
+        self.max_pending = max_pending or config.PIPELINE_MAX_PENDING
+        self.store = store or JobStore()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='pipeline'
+        )
+
+    def submit(self, pipeline_factory: Callable, user_id: str = None) -> Job:
+        """
+        Queue a pipeline run
+        Args:
+            pipeline_factory: Callable taking a progress callback (stage, progress)
+                and a stage-finish callback (stage, seconds) and returning an
+                object with a run() method
+            user_id: LINE user ID that requested the run
+        Returns: The queued Job
+        """
+        job = self.store.create(user_id=user_id, max_active=self.max_workers + self.max_pending)
+        self._executor.submit(self._run_job, job.job_id, pipeline_factory)
+        return job
+
+    def _run_job(self, job_id: str, pipeline_factory: Callable):
+        """Worker body: build and run the pipeline, recording progress"""
+        self.store.start(job_id)
+
+        def on_progress(stage: str, progress: int):
+            self.store.update_stage(job_id, stage, progress)
+
+        def on_stage_finish(stage: str, seconds: float):
+            self.store.finish_stage(job_id, stage, seconds)
+
+        try:
+            pipeline = pipeline_factory(on_progress, on_stage_finish)
+            result = pipeline.run()
+            self.store.finish(job_id, result=result)
+            print(f"Pipeline job {job_id} completed")
+        except Exception as e:
+            self.store.finish(job_id, error=str(e))
+            print(f"Pipeline job {job_id} failed: {e}")
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for running ones"""
+        self._executor.shutdown(wait=wait)
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Get the process-wide job queue"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
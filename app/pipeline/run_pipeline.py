@@ -2,151 +2,514 @@
 Main Pipeline Runner
 Orchestrates the entire video generation process
 """
+import multiprocessing
+import queue
 import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Iterable
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from config import config
 from app.core.ai_news import NewsSearcher
 from app.core.ai_script import ScriptGenerator
 from app.core.ai_metadata import MetadataGenerator
+from app.core.ai_content import ContentGenerator
+from app.core.clients import ClientRegistry, get_client_registry
+from app.core.llm_cache import get_response_cache
+from app.core.llm_gateway import LLMGateway
+from app.core.prompts import get_prompt_registry
 from app.core.line_notify import LineNotifier
 from app.core.tts import GeminiTTS
+from app.core.tts_cache import get_utterance_cache
+from app.core.subtitles import build_subtitles
+from app.core.subtitle_renderer import find_subtitle_font
 from app.core.video import VideoGenerator
 from app.core.thumbnail import ThumbnailGenerator
 from app.core.youtube_uploader import YouTubeUploader
+from app.core.workspace import Workspace, WorkspaceManager, get_workspace_manager
+from app.pipeline.checkpoints import CheckpointStore
+from app.pipeline.scheduler import Stage, StageScheduler, StageFailedError
 
 
 class VideoPipeline:
     """Main video generation pipeline"""
 
-    def __init__(self, user_id: str = None, enable_full_pipeline: bool = False):
+    def __init__(
+        self,
+        user_id: str = None,
+        enable_full_pipeline: bool = False,
+        progress_callback: Callable[[str, int], None] = None,
+        stage_finish_callback: Callable[[str, float], None] = None,
+        stream_script: bool = None,
+        run_id: str = None,
+        workspace_manager: WorkspaceManager = None,
+        upload_while_encoding: bool = None,
+        clients: ClientRegistry = None,
+        combined_generation: bool = None,
+        sectioned_script: bool = None
+    ):
         self.user_id = user_id
-        self.notifier = LineNotifier() if user_id else None
+        # Provider clients (and their connection pools) are shared across runs
+        self.clients = clients or get_client_registry()
+        self.notifier = LineNotifier(clients=self.clients) if user_id else None
         self.enable_full_pipeline = enable_full_pipeline
+        self.progress_callback = progress_callback
+        self.stage_finish_callback = stage_finish_callback
+        # Stream script lines into TTS while Claude is still writing
+        self.stream_script = config.SCRIPT_STREAMING if stream_script is None else stream_script
+        # Write script sections concurrently instead of one long serial request
+        self.sectioned_script = config.SCRIPT_SECTIONED if sectioned_script is None else sectioned_script
+        # Script and metadata from one structured request instead of two serial ones
+        self.combined_generation = (
+            config.COMBINED_GENERATION if combined_generation is None else combined_generation
+        )
+        if self.combined_generation and self.sectioned_script:
+            print("⚠️  COMBINED_GENERATION and SCRIPT_SECTIONED are both set; using combined generation")
+        # Upload fragmented MP4 while it is still being encoded
+        self.upload_while_encoding = (
+            config.UPLOAD_WHILE_ENCODING if upload_while_encoding is None else upload_while_encoding
+        )
 
-        # Initialize all modules
-        self.news_searcher = NewsSearcher()
-        self.script_generator = ScriptGenerator()
-        self.metadata_generator = MetadataGenerator()
+        # Every file this run writes lives in its own workspace
+        self.workspaces = workspace_manager or get_workspace_manager()
+        self.workspace = self.workspaces.create(run_id)
+        self.run_id = self.workspace.run_id
+        try:
+            # Demo and full runs produce different outputs, so they never share checkpoints
+            self.checkpoints = CheckpointStore(
+                self.workspace.directory('checkpoints', 'full' if enable_full_pipeline else 'demo')
+            ) if config.PIPELINE_CHECKPOINTS else None
+
+            # Initialize all modules
+            self.llm_cache = get_response_cache() if config.LLM_CACHE_ENABLED else None
+            # One gateway per run: its token budget and accounting cover every Claude call of the run
+            self.llm = LLMGateway(clients=self.clients)
+            self.news_searcher = NewsSearcher(cache=self.llm_cache, gateway=self.llm)
+            self.script_generator = ScriptGenerator(cache=self.llm_cache, gateway=self.llm)
+            self.metadata_generator = MetadataGenerator(cache=self.llm_cache, gateway=self.llm)
+            self.content_generator = ContentGenerator(cache=self.llm_cache, gateway=self.llm)
+
+            # Captions need a Japanese-capable font; check once here rather than crash in the video stage
+            self.subtitles_enabled = config.SUBTITLES_ENABLED and enable_full_pipeline
+            if self.subtitles_enabled and find_subtitle_font() is None:
+                print("⚠️  No Japanese-capable font found (set SUBTITLE_FONT); rendering without subtitles")
+                self.subtitles_enabled = False
 
-        # Initialize media modules (only if full pipeline enabled)
-        if enable_full_pipeline:
-            self.tts = GeminiTTS()
-            self.video_gen = VideoGenerator()
-            self.thumbnail_gen = ThumbnailGenerator()
-            self.youtube_uploader = YouTubeUploader()
+            # Initialize media modules (only if full pipeline enabled)
+            if enable_full_pipeline:
+                self.tts = GeminiTTS(
+                    cache=get_utterance_cache() if config.TTS_CACHE_ENABLED else None,
+                    workspace=self.workspace,
+                    clients=self.clients
+                )
+                self.thumbnail_gen = ThumbnailGenerator(workspace=self.workspace)
+                self.youtube_uploader = YouTubeUploader()
+        except Exception:
+            # A run that never starts must not keep its workspace pinned as live
+            self.workspaces.release(self.workspace, False)
+            raise
+
+    @classmethod
+    def resume(cls, run_id: str, workspace_manager: WorkspaceManager = None, **kwargs) -> dict:
+        """
+        Re-run a previous run, skipping every stage whose checkpoint is still valid
+        A stage re-runs when its inputs changed upstream or its artifacts were modified
+        Args:
+            run_id: Run to resume (see result['run_id'])
+            workspace_manager: Manager holding the run's workspace
+            **kwargs: Passed to VideoPipeline
+        Returns: dict with results
+        """
+        workspaces = workspace_manager or get_workspace_manager()
+        if workspaces.get(run_id) is None:
+            raise ValueError(f"No workspace for run {run_id}")
+
+        # Streaming hands lines to TTS through an in-memory queue, which cannot
+        # be replayed; the batch graph restores script and TTS from checkpoints
+        kwargs['stream_script'] = False
+        pipeline = cls(run_id=run_id, workspace_manager=workspaces, **kwargs)
+        return pipeline.run()
+
+    def build_stages(self) -> list[Stage]:
+        """Describe the pipeline as a dependency graph of stages"""
+        return [
+            Stage('news', self._stage_news, [], ['news_summary']),
+            *self._script_and_tts_stages(),
+            Stage('thumbnail', self._stage_thumbnail, ['metadata'], ['thumbnail_file']),
+            *self._video_and_upload_stages()
+        ]
+
+    def _video_and_upload_stages(self) -> list[Stage]:
+        """Video and upload stages; overlapped into one stage when uploading while encoding"""
+        if self.enable_full_pipeline and self.upload_while_encoding:
+            return [
+                Stage(
+                    'video_upload',
+                    self._stage_video_upload,
+                    ['audio_file', 'subtitles', 'workspace', 'metadata', 'thumbnail_file'],
+                    ['video_file', 'youtube_url']
+                )
+            ]
+
+        return [
+            Stage(
+                'video',
+                render_video if self.enable_full_pipeline else _skip_video,
+                ['audio_file', 'subtitles', 'workspace'],
+                ['video_file'],
+                kind='process' if self.enable_full_pipeline else 'thread'
+            ),
+            Stage(
+                'upload',
+                self._stage_upload,
+                ['video_file', 'metadata', 'thumbnail_file'],
+                ['youtube_url']
+            )
+        ]
 
     def run(self) -> dict:
         """
         Execute full pipeline
+        Independent stages (metadata, TTS, thumbnail) run concurrently, so
+        end-to-end latency follows the critical path
         Returns: dict with results
         """
+        success = False
         try:
+            self.workspace.set_status('running')
             if self.notifier:
                 self.notifier.notify_start(self.user_id)
 
-            # Step 1: Search news
-            print("📰 Searching for economic news...")
-            news_result = self.news_searcher.get_news_summary()
-            news_summary = news_result['raw']
-            print(f"✅ Found news:\n{news_summary[:200]}...")
-
-            # Step 2: Generate script
-            print("\n📝 Generating dialogue script...")
-            script = self.script_generator.generate_script(news_summary)
-            parsed_script = self.script_generator.parse_script(script)
-            print(f"✅ Generated script with {len(parsed_script)} dialogue lines")
-
-            # Step 3: Generate metadata
-            print("\n🏷️  Generating metadata...")
-            metadata = self.metadata_generator.generate_metadata(script)
-            print(f"✅ Title: {metadata['title']}")
-
-            # Step 4: TTS
-            audio_file = None
-            if self.enable_full_pipeline:
-                print("\n🎤 Generating audio...")
-                audio_files = self.tts.generate_audio(parsed_script, output_dir="temp/audio")
-                audio_file = self.tts.concatenate_audio(audio_files, "temp/final_audio.wav")
-                print(f"✅ Audio generated: {audio_file}")
-            else:
-                print("\n🎤 Audio generation (skipped - demo mode)")
-
-            # Step 5: Video generation
-            video_file = None
-            if self.enable_full_pipeline and audio_file:
-                print("\n🎬 Generating video...")
-                video_file = self.video_gen.create_video(
-                    audio_file=audio_file,
-                    output_file="temp/final_video.mp4"
-                )
-                print(f"✅ Video generated: {video_file}")
-            else:
-                print("\n🎬 Video generation (skipped - demo mode)")
-
-            # Step 6: Generate thumbnail
-            thumbnail_file = None
-            if self.enable_full_pipeline:
-                print("\n🖼️  Generating thumbnail...")
-                thumbnail_file = self.thumbnail_gen.create_thumbnail(
-                    title=metadata['title'],
-                    output_file="temp/thumbnail.jpg"
-                )
-                print(f"✅ Thumbnail generated: {thumbnail_file}")
-            else:
-                print("\n🖼️  Thumbnail generation (skipped - demo mode)")
-
-            # Step 7: YouTube upload
-            youtube_url = None
-            if self.enable_full_pipeline and video_file:
-                print("\n📤 Uploading to YouTube...")
-                upload_result = self.youtube_uploader.upload_video(
-                    video_file=video_file,
-                    title=metadata['title'],
-                    description=metadata['description'],
-                    tags=metadata['tags'],
-                    thumbnail_file=thumbnail_file
-                )
-                youtube_url = upload_result['url']
-                print(f"✅ Uploaded: {youtube_url}")
-            else:
-                print("\n📤 YouTube upload (skipped - demo mode)")
-                youtube_url = "https://youtube.com/watch?v=demo"
+            started = time.perf_counter()
+            scheduler = StageScheduler(
+                self.build_stages(),
+                on_stage_start=self._on_stage_start,
+                checkpoints=self.checkpoints,
+                on_stage_finish=self.stage_finish_callback
+            )
+            context, timings = scheduler.run({'workspace': self.workspace})
+            total_time = round(time.perf_counter() - started, 3)
 
+            metadata = context['metadata']
             result = {
                 'status': 'success',
-                'news': news_summary,
-                'script': script,
+                'run_id': self.run_id,
+                'workspace': str(self.workspace.root),
+                'news': context['news_summary'],
+                'script': context['script'],
                 'metadata': metadata,
-                'audio_file': audio_file,
-                'video_file': video_file,
-                'thumbnail_file': thumbnail_file,
-                'youtube_url': youtube_url
+                'audio_file': context['audio_file'],
+                'video_file': context['video_file'],
+                'thumbnail_file': context['thumbnail_file'],
+                'youtube_url': context['youtube_url'],
+                'timings': timings,
+                'total_time': total_time,
+                'restored_stages': scheduler.restored
             }
+            result['llm_usage'] = self.llm.stats()
+            result['prompt_versions'] = get_prompt_registry().versions()
+            if self.llm_cache:
+                result['llm_cache'] = self.llm_cache.stats()
+            if self.enable_full_pipeline:
+                result['tts'] = self.tts.engine.last_run_stats
+            print(f"\n⏱️  Stage timings: {timings} (total {total_time}s)")
+            if scheduler.restored:
+                print(f"♻️  Restored from checkpoints: {', '.join(scheduler.restored)}")
+            usage = result['llm_usage']
+            print(f"🧮 Claude tokens: {usage['total_tokens']} in {len(usage['calls'])} calls")
 
             if self.notifier:
                 self.notifier.notify_success(
                     self.user_id,
                     metadata['title'],
-                    youtube_url
+                    context['youtube_url']
                 )
 
+            success = True
             return result
 
+        except StageFailedError as e:
+            print(f"\n❌ Pipeline failed: {e}")
+            if self.notifier:
+                self.notifier.notify_error(self.user_id, e.stage, str(e.error))
+            raise e.error
         except Exception as e:
             print(f"\n❌ Pipeline failed: {e}")
             if self.notifier:
                 self.notifier.notify_error(self.user_id, "Pipeline", str(e))
             raise
+        finally:
+            self.workspaces.release(self.workspace, success)
+
+    def _script_and_tts_stages(self) -> list[Stage]:
+        """
+        Script, metadata and TTS stages
+        Combined mode produces script and metadata in one stage; in streaming
+        mode (not combined with sectioned scripts) TTS consumes lines as they arrive
+        """
+        if self.combined_generation:
+            return [
+                Stage(
+                    'content',
+                    self._stage_content,
+                    ['news_summary'],
+                    ['script', 'parsed_script', 'metadata']
+                ),
+                Stage('tts', self._stage_tts, ['parsed_script'], ['audio_file', 'subtitles'])
+            ]
+
+        metadata = Stage('metadata', self._stage_metadata, ['script'], ['metadata'])
+        if self.stream_script and not self.sectioned_script:
+            return [
+                Stage(
+                    'script',
+                    self._stage_script_streaming,
+                    ['news_summary'],
+                    ['script', 'parsed_script', 'audio_future']
+                ),
+                Stage(
+                    'tts',
+                    self._stage_tts_streaming,
+                    ['audio_future', 'parsed_script'],
+                    ['audio_file', 'subtitles']
+                ),
+                metadata
+            ]
+
+        return [
+            Stage('script', self._stage_script, ['news_summary'], ['script', 'parsed_script']),
+            Stage('tts', self._stage_tts, ['parsed_script'], ['audio_file', 'subtitles']),
+            metadata
+        ]
+
+    def _stage_news(self) -> dict:
+        """Step 1: Search news"""
+        print("📰 Searching for economic news...")
+        news_result = self.news_searcher.get_news_summary()
+        news_summary = news_result['raw']
+        print(f"✅ Found news:\n{news_summary[:200]}...")
+        return {'news_summary': news_summary}
+
+    def _stage_script(self, news_summary: str) -> dict:
+        """Step 2: Generate script"""
+        print("\n📝 Generating dialogue script...")
+        if self.sectioned_script:
+            script = self.script_generator.generate_script_sectioned(news_summary)
+        else:
+            script = self.script_generator.generate_script(news_summary)
+        parsed_script = self.script_generator.parse_script(script)
+        print(f"✅ Generated script with {len(parsed_script)} dialogue lines")
+        return {'script': script, 'parsed_script': parsed_script}
+
+    def _stage_content(self, news_summary: str) -> dict:
+        """Steps 2+3 (combined): Generate script and metadata in one structured call"""
+        print("\n📝 Generating script and metadata...")
+        content = self.content_generator.generate_content(news_summary)
+        print(f"✅ Generated script with {len(content['parsed_script'])} dialogue lines")
+        print(f"✅ Title: {content['metadata']['title']}")
+        return content
+
+    def _stage_script_streaming(self, news_summary: str) -> dict:
+        """Step 2 (streaming): Generate script and start TTS on each completed line"""
+        print("\n📝 Streaming dialogue script...")
+        stream = self.script_generator.stream_script(news_summary)
+        tts_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tts-stream')
+
+        audio_future = None
+        line_queue = None
+        if self.enable_full_pipeline:
+            line_queue = queue.Queue()
+            audio_future = tts_executor.submit(
+                self._generate_audio_file, iter(line_queue.get, None)
+            )
+        tts_executor.shutdown(wait=False)
+
+        parsed_script = []
+        try:
+            for line in stream:
+                parsed_script.append(line)
+                if line_queue is not None:
+                    line_queue.put(line)
+        finally:
+            if line_queue is not None:
+                line_queue.put(None)
+
+        print(f"✅ Generated script with {len(parsed_script)} dialogue lines")
+        return {'script': stream.text, 'parsed_script': parsed_script, 'audio_future': audio_future}
+
+    def _stage_tts_streaming(self, audio_future: Future, parsed_script: list[dict]) -> dict:
+        """Step 4 (streaming): Wait for the TTS started during script generation"""
+        if audio_future is None:
+            print("\n🎤 Audio generation (skipped - demo mode)")
+            return {'audio_file': None, 'subtitles': None}
+
+        audio_file, timings = audio_future.result()
+        print(f"✅ Audio generated: {audio_file}")
+        return {'audio_file': audio_file, 'subtitles': self._build_subtitles(parsed_script, timings)}
+
+    def _generate_audio_file(self, script_lines: Iterable[dict]) -> tuple[str, list[dict]]:
+        """Synthesise script lines and concatenate them into one audio file with line timings"""
+        audio_files = self.tts.generate_audio(script_lines)
+        return self.tts.concatenate_audio(audio_files, return_timings=True)
+
+    def _build_subtitles(self, parsed_script: list[dict], timings: list[dict]) -> list[dict] | None:
+        """Turn per-line audio offsets into captions for the video stage"""
+        if not self.subtitles_enabled:
+            return None
+        subtitles = build_subtitles(parsed_script, timings, max_chars=config.SUBTITLE_MAX_CHARS)
+        print(f"✅ Built {len(subtitles)} subtitles")
+        return subtitles
+
+    def _stage_metadata(self, script: str) -> dict:
+        """Step 3: Generate metadata"""
+        print("\n🏷️  Generating metadata...")
+        metadata = self.metadata_generator.generate_metadata(script)
+        print(f"✅ Title: {metadata['title']}")
+        return {'metadata': metadata}
+
+    def _stage_tts(self, parsed_script: list[dict]) -> dict:
+        """Step 4: TTS"""
+        if not self.enable_full_pipeline:
+            print("\n🎤 Audio generation (skipped - demo mode)")
+            return {'audio_file': None, 'subtitles': None}
+
+        print("\n🎤 Generating audio...")
+        audio_file, timings = self._generate_audio_file(parsed_script)
+        print(f"✅ Audio generated: {audio_file}")
+        return {'audio_file': audio_file, 'subtitles': self._build_subtitles(parsed_script, timings)}
+
+    def _stage_thumbnail(self, metadata: dict) -> dict:
+        """Step 6: Generate thumbnail"""
+        if not self.enable_full_pipeline:
+            print("\n🖼️  Thumbnail generation (skipped - demo mode)")
+            return {'thumbnail_file': None}
+
+        print("\n🖼️  Generating thumbnail...")
+        thumbnail_file = self.thumbnail_gen.create_thumbnail(title=metadata['title'])
+        print(f"✅ Thumbnail generated: {thumbnail_file}")
+        return {'thumbnail_file': thumbnail_file}
+
+    def _stage_upload(self, video_file: str, metadata: dict, thumbnail_file: str) -> dict:
+        """Step 7: YouTube upload"""
+        if not (self.enable_full_pipeline and video_file):
+            print("\n📤 YouTube upload (skipped - demo mode)")
+            return {'youtube_url': "https://youtube.com/watch?v=demo"}
+
+        print("\n📤 Uploading to YouTube...")
+        upload_result = self.youtube_uploader.upload_video(
+            video_file=video_file,
+            title=metadata['title'],
+            description=metadata['description'],
+            tags=metadata['tags'],
+            thumbnail_file=thumbnail_file,
+            # Persisted with the run so a resumed run continues the same upload
+            session_file=str(self.workspace.path("upload_session.json"))
+        )
+        youtube_url = upload_result['url']
+        print(f"✅ Uploaded: {youtube_url}")
+        return {'youtube_url': youtube_url}
+
+    def _stage_video_upload(
+        self,
+        audio_file: str,
+        subtitles: list[dict],
+        workspace: Workspace,
+        metadata: dict,
+        thumbnail_file: str
+    ) -> dict:
+        """Steps 5 and 7 overlapped: fragments are uploaded as the encoder writes them"""
+        if not audio_file:
+            skipped = _skip_video(audio_file, subtitles, workspace)
+            return {**skipped, **self._stage_upload(None, metadata, thumbnail_file)}
+
+        video_file = str(workspace.video_file)
+        # A previous attempt's output must not be mistaken for new fragments
+        Path(video_file).unlink(missing_ok=True)
+
+        with ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context('spawn')
+        ) as encoder:
+            encoding = encoder.submit(render_video, audio_file, subtitles, workspace, fragmented=True)
+
+            def encoder_finished() -> bool:
+                if not encoding.done():
+                    return False
+                # Re-raise encoder failures before the upload is finalised
+                encoding.result()
+                return True
+
+            print("\n📤 Uploading to YouTube while encoding...")
+            upload_result = self.youtube_uploader.upload_video(
+                video_file=video_file,
+                title=metadata['title'],
+                description=metadata['description'],
+                tags=metadata['tags'],
+                thumbnail_file=thumbnail_file,
+                encoder_finished=encoder_finished
+            )
+
+        youtube_url = upload_result['url']
+        print(f"✅ Uploaded: {youtube_url}")
+        return {'video_file': encoding.result()['video_file'], 'youtube_url': youtube_url}
+
+    def _on_stage_start(self, stage: str, progress: int):
+        """Refuse to start a stage once the run is over its disk quota"""
+        self.workspace.check_quota()
+        self.workspace.heartbeat()
+        self._report_progress(stage, progress)
+
+    def _report_progress(self, stage: str, progress: int):
+        """Forward stage changes to the progress callback, if any"""
+        if self.progress_callback:
+            self.progress_callback(stage, progress)
+
+
+def render_video(
+    audio_file: str,
+    subtitles: list[dict],
+    workspace: Workspace,
+    fragmented: bool = False
+) -> dict:
+    """
+    Step 5: Video generation
+    Module-level so it can run in a worker process
+    """
+    if not audio_file:
+        return _skip_video(audio_file, subtitles, workspace)
+
+    print("\n🎬 Generating video...")
+    video_file = VideoGenerator(
+        workers=config.VIDEO_WORKERS,
+        workspace=workspace,
+        fragmented=fragmented
+    ).create_video(
+        audio_file=audio_file,
+        subtitles=subtitles,
+        bgm_file=config.BGM_FILE or None,
+        bgm_volume=config.BGM_VOLUME
+    )
+    print(f"✅ Video generated: {video_file}")
+    return {'video_file': video_file}
+
+
+def _skip_video(audio_file: str, subtitles: list[dict], workspace: Workspace) -> dict:
+    """Video stage placeholder for demo mode"""
+    print("\n🎬 Video generation (skipped - demo mode)")
+    return {'video_file': None}
 
 
 def main():
-    """CLI entry point"""
+    """CLI entry point; `--resume RUN_ID` continues a failed run"""
     print("🚀 Starting YouTube Video Generation Pipeline\n")
-    pipeline = VideoPipeline()
-    result = pipeline.run()
+    if len(sys.argv) == 3 and sys.argv[1] == '--resume':
+        result = VideoPipeline.resume(sys.argv[2])
+    else:
+        result = VideoPipeline().run()
     print("\n✅ Pipeline completed successfully!")
     print(f"Title: {result['metadata']['title']}")
 
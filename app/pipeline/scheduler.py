@@ -0,0 +1,191 @@
+"""
+Stage Scheduler
+Runs pipeline stages as a dependency graph, starting each stage as soon
+as the outputs it needs are available
+"""
+import multiprocessing
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait
+)
+from dataclasses import dataclass, field
+from typing import Callable
+
+from app.pipeline.checkpoints import CheckpointStore, NotCheckpointable
+
+
+class StageFailedError(RuntimeError):
+    """Raised when a stage raises; keeps the failing stage name"""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+@dataclass
+class Stage:
+    """
+    A single pipeline step
+    func receives the values of `inputs` as keyword arguments and returns a
+    dict containing every name in `outputs`. CPU-bound stages set
+    kind='process' and must use a picklable module-level func.
+    """
+
+    name: str
+    func: Callable[..., dict]
+    inputs: list[str] = field(default_factory=list)
+    outputs: list[str] = field(default_factory=list)
+    kind: str = 'thread'  # 'thread' for I/O-bound, 'process' for CPU-bound
+
+
+class StageScheduler:
+    """Dependency-driven scheduler for pipeline stages"""
+
+    def __init__(
+        self,
+        stages: list[Stage],
+        max_threads: int = 4,
+        max_processes: int = 1,
+        on_stage_start: Callable[[str, int], None] = None,
+        checkpoints: CheckpointStore = None,
+        on_stage_finish: Callable[[str, float], None] = None
+    ):
+        self.stages = {stage.name: stage for stage in stages}
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self.on_stage_start = on_stage_start
+        # Called with each stage's wall-clock seconds when it completes or fails
+        self.on_stage_finish = on_stage_finish
+        # Stages with a valid checkpoint are restored instead of re-run
+        self.checkpoints = checkpoints
+        self.restored: list[str] = []
+        self._validate()
+
+    def _validate(self):
+        """Check that every input is produced by exactly one stage and there are no cycles"""
+        producers = {}
+        for stage in self.stages.values():
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"Output '{output}' produced by both '{producers[output]}' and '{stage.name}'")
+                producers[output] = stage.name
+        self._producers = producers
+
+        # Kahn's algorithm over stage -> stage edges
+        remaining = {name: set(self._dependencies(stage)) for name, stage in self.stages.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Stage graph has a cycle among: {', '.join(sorted(remaining))}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def _dependencies(self, stage: Stage) -> list[str]:
+        """Names of the stages whose outputs this stage consumes"""
+        return [self._producers[i] for i in stage.inputs if i in self._producers]
+
+    def run(self, initial: dict = None) -> tuple[dict, dict]:
+        """
+        Execute all stages
+        Args:
+            initial: Values available before any stage runs
+        Returns: (context with every stage output, per-stage wall-clock seconds)
+        """
+        context = dict(initial or {})
+        missing = [
+            i for stage in self.stages.values() for i in stage.inputs
+            if i not in self._producers and i not in context
+        ]
+        if missing:
+            raise ValueError(f"No stage produces inputs: {', '.join(sorted(set(missing)))}")
+
+        pending = dict(self.stages)
+        running: dict[Future, tuple[str, float]] = {}
+        hashes: dict[str, str] = {}
+        timings = {}
+        completed = 0
+        self.restored = []
+
+        threads = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix='stage')
+        processes = None
+        if any(stage.kind == 'process' for stage in self.stages.values()):
+            # Spawn rather than fork: the scheduler usually runs inside a threaded server
+            processes = ProcessPoolExecutor(
+                max_workers=self.max_processes,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+
+        try:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if all(i in context for i in stage.inputs):
+                        del pending[name]
+                        kwargs = {i: context[i] for i in stage.inputs}
+                        restored = self._restore(stage, kwargs, hashes)
+                        if restored is not None:
+                            context.update(restored)
+                            timings[name] = 0.0
+                            self._finished(name, 0.0)
+                            self.restored.append(name)
+                            completed += 1
+                            continue
+                        if self.on_stage_start:
+                            # The hook may veto a stage (e.g. disk quota exceeded)
+                            try:
+                                self.on_stage_start(name, int(100 * completed / len(self.stages)))
+                            except Exception as e:
+                                raise StageFailedError(name, e) from e
+                        executor = processes if stage.kind == 'process' else threads
+                        running[executor.submit(stage.func, **kwargs)] = (name, time.perf_counter())
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, started = running.pop(future)
+                    timings[name] = round(time.perf_counter() - started, 3)
+                    self._finished(name, timings[name])
+                    try:
+                        outputs = future.result()
+                    except Exception as e:
+                        raise StageFailedError(name, e) from e
+
+                    stage = self.stages[name]
+                    for output in stage.outputs:
+                        if output not in outputs:
+                            raise StageFailedError(name, KeyError(f"missing output '{output}'"))
+                        context[output] = outputs[output]
+                    if name in hashes:
+                        self.checkpoints.save(name, hashes[name], outputs)
+                    completed += 1
+        finally:
+            for future in running:
+                future.cancel()
+            threads.shutdown(wait=False, cancel_futures=True)
+            if processes:
+                processes.shutdown(wait=False, cancel_futures=True)
+
+        return context, timings
+
+    def _finished(self, name: str, seconds: float):
+        if self.on_stage_finish:
+            self.on_stage_finish(name, seconds)
+
+    def _restore(self, stage: Stage, kwargs: dict, hashes: dict) -> dict | None:
+        """
+        Outputs from a valid checkpoint, or None if the stage must run
+        Records the inputs hash so the stage is checkpointed when it completes
+        """
+        if not self.checkpoints:
+            return None
+        try:
+            hashes[stage.name] = self.checkpoints.inputs_hash(stage.name, kwargs)
+        except NotCheckpointable:
+            # In-memory inputs (e.g. a streaming future) cannot be replayed
+            return None
+        return self.checkpoints.load(stage.name, hashes[stage.name], stage.outputs)
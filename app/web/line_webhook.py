@@ -4,7 +4,6 @@ Receives and processes LINE webhook events
 """
 from fastapi import FastAPI, Request, HTTPException
 from linebot.v3.webhook import WebhookParser
-from linebot.v3.messaging import ApiClient, MessagingApi
 from linebot.v3.webhooks import MessageEvent, TextMessageContent
 import sys
 from pathlib import Path
@@ -12,14 +11,15 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from config import config
+from app.core.clients import get_client_registry
 from app.pipeline.run_pipeline import VideoPipeline
+from app.pipeline.jobs import Job, get_job_queue, JobQueueFullError
 
 app = FastAPI()
 
 parser = WebhookParser(config.LINE_CHANNEL_SECRET)
-api_client = ApiClient()
-api_client.configuration.access_token = config.LINE_CHANNEL_ACCESS_TOKEN
-messaging_api = MessagingApi(api_client)
+# Same pooled client the pipeline's notifier uses
+messaging_api = get_client_registry().line_messaging
 
 
 @app.post("/webhook")
@@ -41,10 +41,10 @@ async def handle_webhook(request: Request):
 
             # Handle commands
             if text == 'run':
-                # Start video generation pipeline
+                # Queue video generation pipeline
                 await handle_run_command(user_id)
             elif text == 'status':
-                # Check status (not implemented yet)
+                # Report latest job status
                 await handle_status_command(user_id)
             else:
                 # Echo back
@@ -54,24 +54,69 @@ async def handle_webhook(request: Request):
 
 
 async def handle_run_command(user_id: str):
-    """Handle 'run' command to start pipeline"""
+    """Handle 'run' command by queuing the pipeline as a background job"""
     try:
-        pipeline = VideoPipeline(user_id=user_id)
-        # Run pipeline in background (for now, run synchronously)
-        result = pipeline.run()
-        print(f"Pipeline completed for user {user_id}")
-    except Exception as e:
-        print(f"Pipeline failed for user {user_id}: {e}")
+        job = get_job_queue().submit(
+            lambda on_progress, on_stage_finish: VideoPipeline(
+                user_id=user_id,
+                progress_callback=on_progress,
+                stage_finish_callback=on_stage_finish
+            ),
+            user_id=user_id
+        )
+    except JobQueueFullError:
+        await push_message(user_id, "⏳ 現在混み合っています。しばらくしてから再度お試しください")
+        return
+
+    print(f"Pipeline job {job.job_id} queued for user {user_id}")
+    await push_message(user_id, f"📋 ジョブを受け付けました\nジョブID: {job.job_id}")
 
 
 async def handle_status_command(user_id: str):
     """Handle 'status' command"""
+    job = get_job_queue().store.latest_for_user(user_id)
+    if job is None:
+        await push_message(user_id, "実行中または完了したジョブはありません")
+        return
+
+    await push_message(user_id, format_job_status(job))
+
+
+def format_job_status(job: Job) -> str:
+    """Format a job record as a LINE status message"""
+    status_labels = {
+        'queued': '⏳ 待機中',
+        'running': '🔄 実行中',
+        'success': '✅ 完了',
+        'failed': '❌ 失敗'
+    }
+    lines = [
+        f"ジョブID: {job.job_id}",
+        f"状態: {status_labels.get(job.status, job.status)}",
+        f"進捗: {job.progress}%"
+    ]
+    if job.stage:
+        lines.append(f"ステップ: {job.stage}")
+
+    for stage, seconds in job.timings.items():
+        lines.append(f"  {stage}: {seconds:.1f}秒")
+
+    if job.error:
+        lines.append(f"エラー: {job.error}")
+    elif job.result and job.result.get('youtube_url'):
+        lines.append(f"🔗 {job.result['youtube_url']}")
+
+    return "\n".join(lines)
+
+
+async def push_message(user_id: str, text: str):
+    """Push a text message to a LINE user"""
     from linebot.v3.messaging import PushMessageRequest, TextMessage
 
     messaging_api.push_message(
         PushMessageRequest(
             to=user_id,
-            messages=[TextMessage(text="ステータス確認機能は開発中です")]
+            messages=[TextMessage(text=text)]
         )
     )
 
@@ -88,6 +133,22 @@ async def reply_message(reply_token: str, text: str):
     )
 
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get a pipeline job record"""
+    job = get_job_queue().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+
+@app.on_event("shutdown")
+async def shutdown_job_queue():
+    """Stop accepting pipeline jobs when the server exits"""
+    get_job_queue().shutdown(wait=False)
+    get_client_registry().close()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
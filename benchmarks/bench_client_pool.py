@@ -0,0 +1,201 @@
+"""
+Client Pool Benchmark
+Runs waves of concurrent "pipeline runs" (like the job queue with
+PIPELINE_WORKERS runs in flight) against a local stub server speaking the
+Anthropic messages, LINE push and ElevenLabs TTS endpoints, and counts the
+TCP connections the server accepts per wave. Compares one shared
+ClientRegistry with a fresh registry per run (the old behaviour of building
+clients per object).
+
+Within a single wave both modes open about one connection per concurrent
+run; the registry pays off on later waves, which find warm connections in
+its pool instead of connecting again. The stub is plain HTTP on loopback,
+where a handshake costs next to nothing, so wall time is about the same in
+both modes; against real providers each connection not opened saves a TCP
+and TLS handshake.
+
+Each run makes the calls a demo pipeline makes: three Claude messages
+(news, script, metadata), a LINE start and success push, and three TTS requests.
+Providers whose SDK is not installed are skipped.
+
+Usage:
+    python benchmarks/bench_client_pool.py [--runs N] [--waves N] [--latency SECONDS]
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import config
+from app.core.clients import ClientRegistry
+
+
+class StubServer(ThreadingHTTPServer):
+    """Keep-alive server that counts accepted connections and served requests"""
+
+    daemon_threads = True
+    # A burst of connects must not overflow the listen backlog (SYN retries add ~1s)
+    request_queue_size = 128
+
+    def __init__(self, address, latency: float):
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    def reset(self):
+        with self.lock:
+            self.connections = 0
+            self.requests = 0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.latency)
+
+        if self.path.startswith('/v1/messages'):
+            self._json({
+                'id': 'msg_stub',
+                'type': 'message',
+                'role': 'assistant',
+                'model': 'stub',
+                'content': [{'type': 'text', 'text': '{"ok": true}'}],
+                'stop_reason': 'end_turn',
+                'stop_sequence': None,
+                'usage': {'input_tokens': 10, 'output_tokens': 5}
+            })
+        elif self.path.startswith('/v2/bot/message/push'):
+            self._json({'sentMessages': [{'id': '1', 'quoteToken': 'q'}]})
+        elif self.path.startswith('/v1/text-to-speech'):
+            self._body(b'\0' * 1024, 'audio/mpeg')
+        else:
+            self._body(b'', 'text/plain', status=404)
+
+    def _json(self, payload: dict):
+        self._body(json.dumps(payload).encode(), 'application/json')
+
+    def _body(self, body: bytes, content_type: str, status: int = 200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def available_providers() -> list[str]:
+    providers = []
+    for name, module in (('anthropic', 'anthropic'), ('line', 'linebot')):
+        try:
+            __import__(module)
+            providers.append(name)
+        except ImportError:
+            print(f"  ({name} SDK not installed, skipping)")
+    providers.append('http')
+    return providers
+
+
+def pipeline_run(clients: ClientRegistry, providers: list[str], base_url: str):
+    """The provider calls of one demo run"""
+    if 'anthropic' in providers:
+        for _ in range(3):
+            clients.anthropic.messages.create(
+                model='stub',
+                max_tokens=16,
+                messages=[{'role': 'user', 'content': 'hi'}]
+            )
+    if 'line' in providers:
+        from linebot.v3.messaging import PushMessageRequest, TextMessage
+
+        for text in ('start', 'done'):
+            clients.line_messaging.push_message(
+                PushMessageRequest(to='U0', messages=[TextMessage(text=text)])
+            )
+    if 'http' in providers:
+        for _ in range(3):
+            response = clients.http.post(f"{base_url}/v1/text-to-speech/voice", json={'text': 'hi'})
+            response.raise_for_status()
+
+
+def bench(server: StubServer, runs: int, waves: int, shared: bool, providers: list[str], base_url: str) -> list[dict]:
+    """Run `waves` consecutive waves of `runs` concurrent runs; per-wave results"""
+    registry = ClientRegistry()
+
+    def one_run(_):
+        clients = registry if shared else ClientRegistry()
+        try:
+            pipeline_run(clients, providers, base_url)
+        finally:
+            if not shared:
+                clients.close()
+
+    results = []
+    with ThreadPoolExecutor(max_workers=runs) as executor:
+        for _ in range(waves):
+            server.reset()
+            start = time.perf_counter()
+            list(executor.map(one_run, range(runs)))
+            results.append({
+                'seconds': time.perf_counter() - start,
+                'connections': server.connections,
+                'requests': server.requests
+            })
+
+    registry.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark shared provider clients')
+    parser.add_argument('--runs', type=int, default=20, help='Concurrent pipeline runs per wave')
+    parser.add_argument('--waves', type=int, default=3, help='Consecutive waves of runs')
+    parser.add_argument('--latency', type=float, default=0.02, help='Server latency per request')
+    args = parser.parse_args()
+
+    server = StubServer(('127.0.0.1', 0), args.latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    # Point every SDK at the stub server
+    config.ANTHROPIC_BASE_URL = base_url
+    config.LINE_API_URL = base_url
+    config.ANTHROPIC_API_KEY = config.ANTHROPIC_API_KEY or 'stub'
+    config.LINE_CHANNEL_ACCESS_TOKEN = config.LINE_CHANNEL_ACCESS_TOKEN or 'stub'
+
+    print(f"{args.waves} waves of {args.runs} concurrent runs, {args.latency * 1000:.0f} ms per request")
+    providers = available_providers()
+
+    for label, shared in (('per-run clients', False), ('shared registry', True)):
+        waves = bench(server, args.runs, args.waves, shared, providers, base_url)
+        for i, result in enumerate(waves, 1):
+            print(
+                f"  {label:16s} wave {i}  {result['seconds']:.2f}s  "
+                f"{result['connections']:4d} new connections / {result['requests']:4d} requests"
+            )
+        if len(waves) > 1:
+            opened = sum(result['connections'] for result in waves[1:])
+            print(f"  {label:16s} connections opened after wave 1: {opened}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
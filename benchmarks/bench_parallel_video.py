@@ -0,0 +1,63 @@
+"""
+Parallel Video Benchmark
+Measures segment-parallel subtitle rendering across worker counts
+on synthetic audio with one caption every few seconds
+
+Usage:
+    python benchmarks/bench_parallel_video.py [--duration SECONDS] [--workers 1,2,4,8,16]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.video import VideoGenerator
+from bench_still_video import write_synthetic_audio
+
+
+def synthetic_subtitles(duration: float, spacing: float = 4.0) -> list[dict]:
+    """One caption every `spacing` seconds"""
+    subtitles = []
+    start = 0.0
+    i = 0
+    while start + spacing <= duration:
+        subtitles.append({'text': f"Caption number {i}", 'start': start, 'end': start + spacing - 0.2})
+        start += spacing
+        i += 1
+    return subtitles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--duration', type=float, default=300, help="Audio length in seconds")
+    parser.add_argument('--workers', default='1,2,4,8,16', help="Comma-separated worker counts")
+    args = parser.parse_args()
+
+    worker_counts = [int(w) for w in args.workers.split(',')]
+    subtitles = synthetic_subtitles(args.duration)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        audio_file = tmp_dir / "synthetic.wav"
+        print(f"🎵 Writing {args.duration:.0f}s synthetic audio...")
+        write_synthetic_audio(audio_file, args.duration)
+
+        baseline = None
+        for workers in worker_counts:
+            generator = VideoGenerator(workers=workers)
+            start = time.perf_counter()
+            generator.create_video(
+                audio_file=str(audio_file),
+                subtitles=subtitles,
+                output_file=str(tmp_dir / f"parallel_{workers}.mp4")
+            )
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"⏱️  workers={workers:2d}: {elapsed:.1f}s ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
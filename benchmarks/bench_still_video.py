@@ -0,0 +1,79 @@
+"""
+Still-Image Video Benchmark
+Compares the FFmpeg still-image path against MoviePy compositing
+on a synthetic audio file (30 minutes by default)
+
+Usage:
+    python benchmarks/bench_still_video.py [--duration SECONDS]
+"""
+import argparse
+import math
+import struct
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.video import VideoGenerator
+
+
+def write_synthetic_audio(path: Path, duration: float, sample_rate: int = 24000):
+    """Write a mono 16-bit sine tone WAV of the given duration"""
+    period = [
+        int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate))
+        for i in range(sample_rate)
+    ]
+    one_second = struct.pack(f"<{sample_rate}h", *period)
+
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        for _ in range(int(duration)):
+            wav.writeframes(one_second)
+
+
+def time_call(label: str, func, *args, **kwargs) -> float:
+    """Run func and print its wall-clock time"""
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"⏱️  {label}: {elapsed:.1f}s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--duration', type=float, default=1800, help="Audio length in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        audio_file = tmp_dir / "synthetic.wav"
+        print(f"🎵 Writing {args.duration:.0f}s synthetic audio...")
+        write_synthetic_audio(audio_file, args.duration)
+
+        generator = VideoGenerator()
+        still = time_call(
+            "Still-image path",
+            generator.create_video,
+            audio_file=str(audio_file),
+            output_file=str(tmp_dir / "still.mp4"),
+            still_mode=True
+        )
+        composited = time_call(
+            "MoviePy path",
+            generator.create_video,
+            audio_file=str(audio_file),
+            output_file=str(tmp_dir / "moviepy.mp4"),
+            still_mode=False
+        )
+
+        print(f"\n🚀 Speedup: {composited / still:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
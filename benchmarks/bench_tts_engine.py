@@ -0,0 +1,89 @@
+"""
+TTS Engine Benchmark
+Runs ElevenLabsTTS against a local fake text-to-speech server that adds
+per-request latency and rejects bursts above its quota with HTTP 429
+
+Usage:
+    python benchmarks/bench_tts_engine.py [--lines N] [--latency SECONDS] [--rps N]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.tts import ElevenLabsTTS
+from app.core.tts_engine import RateLimiter
+
+
+def make_handler(latency: float, max_rps: float):
+    """Build a request handler simulating a rate-limited TTS provider"""
+    lock = threading.Lock()
+    recent = []
+
+    class FakeTTSHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            now = time.monotonic()
+            with lock:
+                recent[:] = [t for t in recent if now - t < 1.0]
+                throttled = len(recent) >= max_rps
+                if not throttled:
+                    recent.append(now)
+
+            if throttled:
+                self.send_response(429)
+                self.end_headers()
+                return
+
+            time.sleep(latency)
+            body = b'\x00' * 1024
+            self.send_response(200)
+            self.send_header('Content-Type', 'audio/mpeg')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeTTSHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.3, help="Server latency per request")
+    parser.add_argument('--rps', type=float, default=10, help="Server requests-per-second quota")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.latency, args.rps))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_port}"
+
+    script = [
+        {'speaker': 'A' if i % 2 == 0 else 'B', 'text': f"テストのセリフ {i}"}
+        for i in range(args.lines)
+    ]
+
+    for workers in (1, 4, 8, 16):
+        tts = ElevenLabsTTS(
+            api_url=api_url,
+            workers=workers,
+            limiter=RateLimiter(requests_per_second=args.rps)
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            files = tts.generate_script_audio(script, output_dir=tmp)
+            elapsed = time.perf_counter() - start
+        print(f"⏱️  workers={workers:2d}: {len(files)}/{args.lines} lines in {elapsed:.1f}s")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
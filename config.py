@@ -14,6 +14,16 @@ class Config:
     ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY', '')
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
     ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY', '')
+    ELEVENLABS_API_URL = os.getenv('ELEVENLABS_API_URL', 'https://api.elevenlabs.io')
+    # Overrides for proxies or local stub servers (empty = SDK default)
+    ANTHROPIC_BASE_URL = os.getenv('ANTHROPIC_BASE_URL', '')
+    LINE_API_URL = os.getenv('LINE_API_URL', 'https://api.line.me')
+
+    # Pooled provider connections shared by every pipeline run
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '20'))
+    # Idle seconds before pooled connections are dropped; also the TCP keep-alive probe delay
+    HTTP_KEEPALIVE_SECONDS = float(os.getenv('HTTP_KEEPALIVE_SECONDS', '60'))
+    HTTP_TIMEOUT_SECONDS = float(os.getenv('HTTP_TIMEOUT_SECONDS', '120'))
 
     # LINE Integration
     LINE_CHANNEL_SECRET = os.getenv('LINE_CHANNEL_SECRET', '')
@@ -23,6 +33,13 @@ class Config:
     YOUTUBE_CLIENT_ID = os.getenv('YOUTUBE_CLIENT_ID', '')
     YOUTUBE_CLIENT_SECRET = os.getenv('YOUTUBE_CLIENT_SECRET', '')
     YOUTUBE_REFRESH_TOKEN = os.getenv('YOUTUBE_REFRESH_TOKEN', '')
+    YOUTUBE_UPLOAD_URL = os.getenv('YOUTUBE_UPLOAD_URL', 'https://www.googleapis.com')
+    # Refresh the YouTube access token this many seconds before it expires
+    YOUTUBE_TOKEN_REFRESH_MARGIN = float(os.getenv('YOUTUBE_TOKEN_REFRESH_MARGIN', '300'))
+    # Seconds a videos().list result is served from cache before ETag revalidation
+    YOUTUBE_METADATA_CACHE_TTL = float(os.getenv('YOUTUBE_METADATA_CACHE_TTL', '300'))
+    # Upload fragmented MP4 while the encoder is still writing it
+    UPLOAD_WHILE_ENCODING = os.getenv('UPLOAD_WHILE_ENCODING', 'false').lower() == 'true'
 
     # Google Drive
     GOOGLE_DRIVE_FOLDER_ID = os.getenv('GOOGLE_DRIVE_FOLDER_ID', '')
@@ -31,6 +48,76 @@ class Config:
     PORT = int(os.getenv('PORT', '8000'))
     HOST = os.getenv('HOST', '0.0.0.0')
 
+    # Pipeline job queue
+    PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', '1'))
+    PIPELINE_MAX_PENDING = int(os.getenv('PIPELINE_MAX_PENDING', '4'))
+
+    # Per-stage checkpoints so failed runs can be resumed
+    PIPELINE_CHECKPOINTS = os.getenv('PIPELINE_CHECKPOINTS', 'true').lower() == 'true'
+
+    # Stream script lines into TTS while the script is being written
+    SCRIPT_STREAMING = os.getenv('SCRIPT_STREAMING', 'false').lower() == 'true'
+    # Write intro, each news item and wrap-up concurrently, then stitch (takes precedence over streaming)
+    SCRIPT_SECTIONED = os.getenv('SCRIPT_SECTIONED', 'false').lower() == 'true'
+    SCRIPT_SECTION_WORKERS = int(os.getenv('SCRIPT_SECTION_WORKERS', '6'))
+    # Generate script and metadata in one structured call (takes precedence over sectioned and streaming)
+    COMBINED_GENERATION = os.getenv('COMBINED_GENERATION', 'false').lower() == 'true'
+
+    # TTS concurrency and provider quotas (0 = unlimited)
+    TTS_WORKERS = int(os.getenv('TTS_WORKERS', '4'))
+    TTS_REQUESTS_PER_SECOND = float(os.getenv('TTS_REQUESTS_PER_SECOND', '5'))
+    TTS_CHARS_PER_MINUTE = float(os.getenv('TTS_CHARS_PER_MINUTE', '0'))
+    TTS_MAX_RETRIES = int(os.getenv('TTS_MAX_RETRIES', '3'))
+
+    # Silence (seconds) inserted between lines when concatenating audio
+    TTS_SPEAKER_GAP = float(os.getenv('TTS_SPEAKER_GAP', '0.3'))
+    TTS_LINE_GAP = float(os.getenv('TTS_LINE_GAP', '0.1'))
+
+    # Video encoder processes for subtitle videos (>1 = segment-parallel)
+    VIDEO_WORKERS = int(os.getenv('VIDEO_WORKERS', '1'))
+
+    # Background music mixed under the dialogue (optional)
+    BGM_FILE = os.getenv('BGM_FILE', '')
+    BGM_VOLUME = float(os.getenv('BGM_VOLUME', '0.1'))
+
+    # Subtitles built from per-line audio timings (off by default; needs a CJK font)
+    SUBTITLES_ENABLED = os.getenv('SUBTITLES_ENABLED', 'false').lower() == 'true'
+    SUBTITLE_MAX_CHARS = int(os.getenv('SUBTITLE_MAX_CHARS', '30'))
+    # Japanese-capable font for captions (empty = search the usual system locations)
+    SUBTITLE_FONT = os.getenv('SUBTITLE_FONT', '')
+
+    # TTS utterance cache
+    TTS_CACHE_ENABLED = os.getenv('TTS_CACHE_ENABLED', 'false').lower() == 'true'
+    TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', '.cache/tts')
+    TTS_CACHE_MAX_MB = int(os.getenv('TTS_CACHE_MAX_MB', '500'))
+
+    # Claude response cache
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'false').lower() == 'true'
+    LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', '.cache/llm')
+    LLM_CACHE_MAX_MB = int(os.getenv('LLM_CACHE_MAX_MB', '200'))
+    LLM_CACHE_MAX_AGE_DAYS = int(os.getenv('LLM_CACHE_MAX_AGE_DAYS', '30'))
+
+    # Prompt templates (empty = prompts.yaml at the repository root)
+    PROMPTS_FILE = os.getenv('PROMPTS_FILE', '')
+
+    # Claude gateway: provider-side prompt caching and token budgets (0 = unlimited)
+    # Budgets count input-token equivalents: cache reads weigh 0.1, cache writes 1.25
+    LLM_PROMPT_CACHING = os.getenv('LLM_PROMPT_CACHING', 'true').lower() == 'true'
+    LLM_RUN_TOKEN_BUDGET = int(os.getenv('LLM_RUN_TOKEN_BUDGET', '0'))
+    LLM_DAILY_TOKEN_BUDGET = int(os.getenv('LLM_DAILY_TOKEN_BUDGET', '0'))
+    # Cheaper model used once LLM_DOWNGRADE_AT of a budget is spent
+    LLM_FALLBACK_MODEL = os.getenv('LLM_FALLBACK_MODEL', 'claude-3-5-haiku-20241022')
+    LLM_DOWNGRADE_AT = float(os.getenv('LLM_DOWNGRADE_AT', '0.8'))
+    LLM_USAGE_FILE = os.getenv('LLM_USAGE_FILE', '.cache/llm_usage.json')
+
+    # Per-run workspaces (quotas in MB, 0 = unlimited)
+    WORKSPACE_ROOT = os.getenv('WORKSPACE_ROOT', 'temp/runs')
+    WORKSPACE_RUN_QUOTA_MB = int(os.getenv('WORKSPACE_RUN_QUOTA_MB', '4096'))
+    WORKSPACE_GLOBAL_QUOTA_MB = int(os.getenv('WORKSPACE_GLOBAL_QUOTA_MB', '20480'))
+    WORKSPACE_KEEP_SUCCESSFUL = int(os.getenv('WORKSPACE_KEEP_SUCCESSFUL', '3'))
+    WORKSPACE_KEEP_FAILED = int(os.getenv('WORKSPACE_KEEP_FAILED', '3'))
+    WORKSPACE_RETENTION_HOURS = float(os.getenv('WORKSPACE_RETENTION_HOURS', '24'))
+
     @classmethod
     def validate(cls):
         """Validate required configuration"""